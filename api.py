@@ -0,0 +1,105 @@
+import gzip
+import hashlib
+import json
+from flask import Blueprint, Response, request, url_for
+from database import booking_as_dict, get_booking
+from command_processing import render_result, run_command
+from renderers import render_json
+from lexer_parser import parse_command
+from paging import MAX_PAGE_SIZE, read_page
+
+# JSON API mirroring the HTML form, registered by both Flask entry points
+api_bp = Blueprint('api', __name__, url_prefix='/api')
+
+GZIP_MIN_BYTES = 1024  # Smaller bodies aren't worth compressing
+
+def _json_response(payload, status=200, etag=False):
+    """
+    Builds a compact JSON response
+
+    Args:
+        payload: JSON-serializable object
+        status (int): HTTP status code
+        etag (bool): Add an ETag and answer 304 when the client's copy matches
+
+    Notes:
+        - No whitespace in the encoding
+        - Gzipped when the client accepts it and the body is large enough
+        - The ETag names the encoding ("-gzip" suffix), since gzip and
+          identity bodies are different byte sequences
+    """
+    body = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+    response = Response(mimetype='application/json', status=status)
+    response.vary.add('Accept-Encoding')
+    compress = len(body) >= GZIP_MIN_BYTES and 'gzip' in request.accept_encodings
+    if etag:
+        response.set_etag(hashlib.sha1(body).hexdigest() + ('-gzip' if compress else ''))
+        if request.if_none_match.contains(response.get_etag()[0]):
+            response.status_code = 304
+            return response
+    if compress:
+        body = gzip.compress(body, compresslevel=5)
+        response.headers['Content-Encoding'] = 'gzip'
+    response.set_data(body)
+    return response
+
+def _error(message, status):
+    """JSON error body in the same shape as a failed command"""
+    return _json_response({'status': 'error', 'message': message}, status)
+
+@api_bp.route('/commands', methods=['POST'])
+def api_command():
+    """
+    Runs one command
+
+    Body:
+        JSON {"command": "..."} or the command as text/plain
+
+    Returns:
+        JSON: {"status", "message", "explanation", "data"} plus "bookings"
+              (first page) and "next" for VIEW BOOKINGS
+
+    Notes:
+        - Responds 200 for warnings and command errors; the outcome is in
+          "status". 400 only for a malformed request.
+    """
+    if request.is_json:
+        payload = request.get_json(silent=True)
+        command = payload.get('command') if isinstance(payload, dict) else None
+        if not isinstance(command, str):
+            return _error("Expected a JSON object with a 'command' string", 400)
+    else:
+        command = request.get_data(as_text=True)
+    command = command.strip()
+
+    result = run_command(command, parse_command(command) if command else None)
+    payload = render_result(render_json, result, max_rows=MAX_PAGE_SIZE)
+    if 'next_after' in payload:
+        payload['next'] = url_for('api.api_bookings', after=payload.pop('next_after'))
+    return _json_response(payload)
+
+@api_bp.route('/bookings')
+def api_bookings():
+    """
+    Paged booking listing
+
+    Query Parameters:
+        after (int): Cursor from the previous page's "next" link
+        limit (int): Page size (default 50, max 500)
+        resource, person, status: Exact-match filters
+
+    Returns:
+        JSON: {"bookings": [...], "next": url or null}, with an ETag so
+              unchanged pages can be revalidated for free
+    """
+    rows, next_url = read_page('api.api_bookings')
+    return _json_response({'bookings': [booking_as_dict(row) for row in rows], 'next': next_url},
+                          etag=True)
+
+@api_bp.route('/bookings/<int:booking_id>')
+def api_booking(booking_id):
+    """Returns one booking, or 404"""
+    row = get_booking(booking_id)
+    if row is None:
+        return _error(f"No booking #{booking_id}", 404)
+    return _json_response(booking_as_dict(row), etag=True)
@@ -1,11 +1,20 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file
-from command_processing import process_command, generate_ast
-from lexer_parser import parser
+from flask import Flask, Response, render_template, request, redirect, url_for, flash
+from markupsafe import Markup
+from command_processing import render_result, run_command
+from renderers import render_html
+from ast_generator import request_ast_render, AST_MIMETYPES
+from lexer_parser import parse_command
 from database import initialize_db
-from config import show_help
+from event_catalog import initialize_catalog
+from booking_views import bookings_bp, next_page_url
+from paging import DEFAULT_PAGE_SIZE
+from api import api_bp
+from config import show_help, AST_DEFAULT_FORMAT
 
 app = Flask(__name__)
 app.secret_key = "supersecretkey"  # Needed for flashing messages
+app.register_blueprint(bookings_bp)
+app.register_blueprint(api_bp)
 
 # Initialize database with error handling
 db = None
@@ -13,6 +22,7 @@ try:
     db = initialize_db()
     if db is None:
         print("Warning: Database initialization returned None")
+    initialize_catalog()  # Loads events and starts the background refresh
 except Exception as e:
     print(f"Fatal error initializing DB: {e}")
 
@@ -25,8 +35,10 @@ def index():
         command = request.form.get("command_input", "").strip()
         if command:
             try:
-                result = parser.parse(command.lower())
-                output = process_command(command, result, None)  # Pass None to get return value
+                result = run_command(command, parse_command(command))
+                # VIEW shows the first page and links to /bookings for the rest
+                output = Markup(render_result(render_html, result, max_rows=DEFAULT_PAGE_SIZE,
+                                              next_url=next_page_url))  # Escaped by render_html
             except Exception as e:
                 output = f"Error: {str(e)}"
                 print(f"Detailed error: {e}")  # For debugging
@@ -38,13 +50,22 @@ def index():
 @app.route("/show_ast", methods=["POST"])
 def show_ast_route():
     command = request.form.get("command_input", "").strip()
-    if command:
-        try:
-            result = parser.parse(command.lower())
-            ast_path = generate_ast(result)
-            return send_file(ast_path, mimetype='image/png')
-        except Exception as e:
-            flash(f"Error generating AST: {str(e)}", "error")
+    fmt = request.values.get("format", AST_DEFAULT_FORMAT)  # png, svg or dot
+    engine = request.values.get("engine") or None           # builtin or graphviz
+    if fmt not in AST_MIMETYPES:
+        flash(f"Unsupported AST format '{fmt}'.", "error")
+    elif command:
+        # Rendered in memory on the background pool; never blocks for long
+        render = request_ast_render(parse_command(command), fmt, engine)
+        if render.status == 'ready':
+            return Response(render.data, mimetype=AST_MIMETYPES[fmt])
+        if render.status == 'pending':
+            return Response("The AST is still rendering; try again in a moment.", status=202,
+                            mimetype='text/plain', headers={'Retry-After': '1'})
+        if render.status == 'busy':
+            return Response("The AST renderer is busy; try again shortly.", status=503,
+                            mimetype='text/plain', headers={'Retry-After': '2'})
+        flash(f"Error generating AST: {render.error}", "error")
     else:
         flash("No command to generate AST from.", "error")
 
@@ -1,42 +1,426 @@
-from graphviz import Digraph
+import hashlib
+import subprocess
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from html import escape
+from config import (AST_CACHE_MAX_ENTRIES, AST_CACHE_MAX_BYTES, AST_RENDER_WORKERS,
+                    AST_RENDER_QUEUE_LIMIT, AST_RENDER_WAIT, AST_RENDER_TIMEOUT,
+                    AST_RENDER_RETAIN)
 
-def generate_ast(parsed_command, filename='ast'):
+# Content types of the supported output formats
+AST_MIMETYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+    'dot': 'text/vnd.graphviz',
+}
+
+class RenderCache:
     """
-    Generates a visual Abstract Syntax Tree (AST) representation of parsed commands
-    as a PNG image using Graphviz.
+    LRU cache of rendered AST images, bounded by entry count and total bytes
     
+    Notes:
+        - Keys are content addresses of the parse tree (see ast_cache_key),
+          so every request for the same command shares one render
+        - Thread-safe; Flask request threads share the module-level cache
     """
-    # Initialize directed graph with global styling
-    dot = Digraph(comment='AST', format='png')
+    def __init__(self, max_entries=AST_CACHE_MAX_ENTRIES, max_bytes=AST_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the cached bytes for key (marking them recently used), or None"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def set(self, key, data):
+        """Stores data, evicting least recently used entries to stay within bounds"""
+        if len(data) > self.max_bytes:
+            return  # Would evict everything else; not worth caching
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = data
+            self._size += len(data)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Returns hit/miss counters and current size"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self._entries), 'bytes': self._size}
+
+# Rendered images shared by all callers
+render_cache = RenderCache()
+
+# Unified visual styling for all nodes, in serialization order
+AST_NODE_STYLE = (
+    ('shape', 'ellipse'),        # Rounded node shapes
+    ('style', 'filled'),         # Filled background
+    ('fillcolor', '#f0f8ff'),    # Light blue fill color
+    ('fixedsize', 'true'),       # Consistent node sizes
+    ('width', '1.8'),            # Node width in inches
+    ('height', '0.9'),           # Node height in inches
+    ('fontsize', '10'),          # Font size
+    ('fontname', 'Arial'),       # Clean font face
+)
+
+# Details keys in display order; unknown keys follow alphabetically
+_DETAIL_KEY_ORDER = ('type', 'name', 'from', 'to', 'date', 'time', 'person', 'booking_id', 'action')
+
+class _TreeRecorder:
+    """Graph target for _add_ast_nodes(): collects nodes and edges in emission order"""
+    def __init__(self):
+        self.labels = OrderedDict()
+        self.edges = []
+
+    def node(self, node_id, label=''):
+        self.labels.setdefault(node_id, label)
+
+    def edge(self, parent_id, child_id):
+        self.edges.append((parent_id, child_id))
+
+def _build_tree(parsed_command):
+    """Records the AST nodes of a parsed command (empty unless it is a tuple)"""
+    tree = _TreeRecorder()
+    if isinstance(parsed_command, tuple):
+        _add_ast_nodes(tree, parsed_command)
+    return tree
+
+def _dot_quote(value):
+    """Quotes a DOT id or label"""
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'"{text}"'
+
+def ast_to_dot(parsed_command):
+    """
+    Serializes the AST of a parsed command as canonical DOT source
+    
+    Returns:
+        str: DOT text, byte-identical for equal parse trees
     
+    Notes:
+        - Node ids are paths from the root (see _add_ast_nodes), Details
+          keys follow a fixed order, and every id/label is quoted the same
+          way, so the text doesn't depend on object identity, dict
+          insertion order or the graphviz package version
+        - Used as the render cache key and as input to Graphviz
+    """
+    tree = _build_tree(parsed_command)
+    style = " ".join(f"{name}={_dot_quote(value)}" for name, value in AST_NODE_STYLE)
+    lines = ["digraph AST {", f"\tnode [{style}]"]
+    lines.extend(f"\t{_dot_quote(node_id)} [label={_dot_quote(label)}]" for node_id, label in tree.labels.items())
+    lines.extend(f"\t{_dot_quote(parent_id)} -> {_dot_quote(child_id)}" for parent_id, child_id in tree.edges)
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def ast_cache_key(dot_source, engine, fmt):
+    """Content address of a render: the canonical DOT text plus engine and format"""
+    return hashlib.sha1(f"{engine}:{fmt}:{dot_source}".encode('utf-8')).hexdigest()
+
+# --------------------------
+# Built-in SVG Renderer
+# --------------------------
+# Command ASTs are tiny (a command node, a Details node and a handful of
+# key/value leaves), so a simple tree layout in Python is enough. It needs
+# no Graphviz binary and renders in well under a millisecond.
+
+# Node geometry in pixels, matching the Graphviz styling above at 72 dpi
+_NODE_WIDTH = 130
+_NODE_HEIGHT = 65
+_H_GAP = 16
+_V_GAP = 40
+_MARGIN = 8
+_LINE_HEIGHT = 13
+
+def _layout(tree):
+    """
+    Assigns (x, y) centres to the recorded nodes
     
-    # Unified visual styling for all nodes
-    dot.attr('node', 
-             shape='ellipse',        # Rounded node shapes
-             style='filled',         # Filled background
-             fillcolor='#f0f8ff',    # Light blue fill color
-             fixedsize='true',       # Consistent node sizes
-             width='1.8',           # Node width in inches
-             height='0.9',          # Node height in inches
-             fontsize='10',         # Font size
-             fontname='Arial')      # Clean font face
+    Notes:
+        - Leaves take consecutive columns; each parent is centred over its
+          children. A node reached twice keeps its first parent.
+    """
+    children = {node_id: [] for node_id in tree.labels}
+    parents = {}
+    for parent_id, child_id in tree.edges:
+        if child_id not in parents and child_id != parent_id:
+            parents[child_id] = parent_id
+            children[parent_id].append(child_id)
+
+    positions = {}
+    next_column = [0]
+
+    def place(node_id, depth):
+        for child_id in children[node_id]:
+            place(child_id, depth + 1)
+        if children[node_id]:
+            first, last = positions[children[node_id][0]], positions[children[node_id][-1]]
+            column = (first[0] + last[0]) / 2
+        else:
+            column = next_column[0]
+            next_column[0] += 1
+        positions[node_id] = (column, depth)
+
+    for node_id in tree.labels:
+        if node_id not in parents:
+            place(node_id, 0)
+    return {node_id: (_MARGIN + _NODE_WIDTH / 2 + column * (_NODE_WIDTH + _H_GAP),
+                      _MARGIN + _NODE_HEIGHT / 2 + depth * (_NODE_HEIGHT + _V_GAP))
+            for node_id, (column, depth) in positions.items()}
+
+def render_svg(parsed_command):
+    """
+    Renders the AST of a parsed command as SVG without Graphviz
     
-    # Only generate AST if the input is a structured command
-    if isinstance(parsed_command, tuple):
-        _add_ast_nodes(dot, parsed_command)
+    Returns:
+        bytes: UTF-8 encoded SVG document
+    """
+    tree = _build_tree(parsed_command)
+    positions = _layout(tree)
+    width = max((x for x, _ in positions.values()), default=0) + _NODE_WIDTH / 2 + _MARGIN
+    height = max((y for _, y in positions.values()), default=0) + _NODE_HEIGHT / 2 + _MARGIN
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+             f'viewBox="0 0 {width:.0f} {height:.0f}" font-family="Arial" font-size="10">',
+             '<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" '
+             'markerHeight="8" orient="auto"><path d="M0,0 L10,5 L0,10 z"/></marker></defs>']
+    for parent_id, child_id in tree.edges:
+        (x1, y1), (x2, y2) = positions[parent_id], positions[child_id]
+        parts.append(f'<line x1="{x1:.1f}" y1="{y1 + _NODE_HEIGHT / 2:.1f}" x2="{x2:.1f}" '
+                     f'y2="{y2 - _NODE_HEIGHT / 2:.1f}" stroke="black" marker-end="url(#arrow)"/>')
+    for node_id, label in tree.labels.items():
+        x, y = positions[node_id]
+        lines = str(label).split('\n')
+        parts.append(f'<ellipse cx="{x:.1f}" cy="{y:.1f}" rx="{_NODE_WIDTH / 2}" ry="{_NODE_HEIGHT / 2}" '
+                     f'fill="#f0f8ff" stroke="black"/>')
+        first_line = y - (len(lines) - 1) * _LINE_HEIGHT / 2 + 3.5
+        spans = "".join(f'<tspan x="{x:.1f}" y="{first_line + index * _LINE_HEIGHT:.1f}">{escape(line)}</tspan>'
+                        for index, line in enumerate(lines))
+        parts.append(f'<text text-anchor="middle">{spans}</text>')
+    parts.append('</svg>')
+    return "".join(parts).encode('utf-8')
+
+def _resolve_engine(fmt, engine):
+    """Picks the default engine for fmt and rejects combinations that can't work"""
+    if engine is None:
+        engine = 'builtin' if fmt in ('svg', 'dot') else 'graphviz'
+    if engine == 'builtin' and fmt not in ('svg', 'dot'):
+        raise ValueError(f"The builtin AST renderer can't produce '{fmt}'; use svg or dot")
+    if engine not in ('builtin', 'graphviz'):
+        raise ValueError(f"Unknown AST render engine '{engine}'")
+    return engine
+
+def _render_graphviz(dot_source, fmt, key):
+    """
+    Renders DOT source with the Graphviz dot binary and caches the result
+    
+    Notes:
+        - Piped through stdin/stdout; no files are written
+        - The process is killed after AST_RENDER_TIMEOUT seconds
+    """
+    try:
+        completed = subprocess.run(['dot', f'-T{fmt}'], input=dot_source.encode('utf-8'),
+                                   capture_output=True, timeout=AST_RENDER_TIMEOUT)
+    except FileNotFoundError:
+        raise RuntimeError("Graphviz is not installed (no 'dot' executable); use format=svg")
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"Graphviz took longer than {AST_RENDER_TIMEOUT:g}s")
+    if completed.returncode != 0:
+        raise RuntimeError(f"Graphviz failed: {completed.stderr.decode('utf-8', 'replace').strip()}")
+    render_cache.set(key, completed.stdout)
+    return completed.stdout
+
+def render_ast(parsed_command, fmt='png', engine=None):
+    """
+    Renders the AST of a parsed command to image bytes
+    
+    Args:
+        parsed_command (tuple): Parser output
+        fmt (str): 'png', 'svg', 'dot' (DOT source) or any Graphviz format
+        engine (str): 'builtin' (pure Python; svg and dot only) or
+                      'graphviz' (dot subprocess). Defaults to builtin
+                      for svg/dot and graphviz for everything else.
+    
+    Returns:
+        bytes: Rendered image (or DOT text)
+    
+    Notes:
+        - Graphviz renders in memory through the dot process's stdin and
+          stdout; no files are written, so concurrent requests can't clash
+        - Results are cached in render_cache; repeated commands don't
+          render again
+        - Blocks for the whole render; request handlers should use
+          request_ast_render() instead
+    """
+    engine = _resolve_engine(fmt, engine)
+    dot_source = ast_to_dot(parsed_command)
+    if fmt == 'dot':
+        return dot_source.encode('utf-8')
+    key = ast_cache_key(dot_source, engine, fmt)
+    data = render_cache.get(key)
+    if data is None:
+        if engine == 'builtin':
+            data = render_svg(parsed_command)
+            render_cache.set(key, data)
+        else:
+            data = _render_graphviz(dot_source, fmt, key)
+    return data
+
+# --------------------------
+# Background Rendering
+# --------------------------
+
+class RenderPool:
+    """
+    Bounded worker pool for Graphviz renders
+    
+    Notes:
+        - Identical renders in flight share one job (keyed like the cache)
+        - At most queue_limit distinct renders are queued or running;
+          beyond that submit() refuses new work instead of queueing it
+        - Finished jobs, failed ones included, are kept for `retain`
+          seconds, so a client polling for a render gets its outcome
+          instead of starting it again
+    """
+    def __init__(self, max_workers=AST_RENDER_WORKERS, queue_limit=AST_RENDER_QUEUE_LIMIT,
+                 retain=AST_RENDER_RETAIN):
+        self.queue_limit = queue_limit
+        self.retain = retain
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ast-render")
+        self._jobs = {}       # key -> Future (queued, running or recently finished)
+        self._finished = {}   # key -> time.monotonic() when the job finished
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args):
+        """
+        Returns the Future rendering key, starting func(*args) unless a job
+        for key is in flight or finished within the last `retain` seconds
+        
+        Returns:
+            Future or None: None when the queue is full
+        """
+        with self._lock:
+            self._expire()
+            future = self._jobs.get(key)
+            if future is not None:
+                return future
+            if len(self._jobs) - len(self._finished) >= self.queue_limit:
+                return None
+            future = self._jobs[key] = self._executor.submit(func, *args)
+        future.add_done_callback(lambda _: self._finish(key))
+        return future
+
+    def _finish(self, key):
+        with self._lock:
+            self._finished[key] = time.monotonic()
+
+    def _expire(self):
+        """Drops jobs that finished more than `retain` seconds ago; caller holds the lock"""
+        cutoff = time.monotonic() - self.retain
+        for key in [key for key, finished_at in self._finished.items() if finished_at <= cutoff]:
+            del self._finished[key]
+            del self._jobs[key]
+
+    def depth(self):
+        """Number of distinct renders queued or running"""
+        with self._lock:
+            return len(self._jobs) - len(self._finished)
+
+# Renders started from request handlers and the GUI
+render_pool = RenderPool()
+
+# Outcome of request_ast_render()
+#   status: 'ready' (data holds the image), 'pending' (still rendering),
+#           'busy' (render queue full) or 'failed' (error holds the reason)
+#   future: the background render when pending; poll it with render_status()
+RenderResult = namedtuple('RenderResult', ['status', 'data', 'error', 'future'],
+                          defaults=[None, None, None])
+
+def render_status(future, wait=0):
+    """
+    RenderResult of a background render, waiting at most `wait` seconds
+
+    Notes:
+        - Lets a caller that got 'pending' follow the same render instead
+          of asking request_ast_render() again
+    """
+    try:
+        return RenderResult('ready', future.result(timeout=wait))
+    except FutureTimeout:
+        return RenderResult('pending', future=future)
+    except Exception as e:
+        return RenderResult('failed', error=str(e))
+
+def request_ast_render(parsed_command, fmt='png', engine=None, wait=AST_RENDER_WAIT):
+    """
+    Renders an AST off the calling thread, waiting at most `wait` seconds
+    
+    Args:
+        parsed_command (tuple): Parser output
+        fmt, engine: See render_ast()
+        wait (float): Seconds to wait for a Graphviz render (0 to just poll)
     
-    # Render and automatically open the visualization
-    dot.render(filename, view=False, cleanup=True)
-    return f"{filename}.png"
+    Returns:
+        RenderResult: Image when ready; otherwise 'pending' or 'busy', and
+                      the caller should ask again shortly (or poll the
+                      pending result's future with render_status())
+    
+    Notes:
+        - A render that outlives `wait` keeps running and lands in the
+          cache, so asking again returns it without re-rendering
+        - Asking again soon after a render failed returns the failure
+          (see RenderPool) rather than trying again
+        - Builtin svg/dot output is cheap and is produced inline
+    """
+    try:
+        engine = _resolve_engine(fmt, engine)
+        if engine == 'builtin' or fmt == 'dot':
+            return RenderResult('ready', render_ast(parsed_command, fmt, engine))
+    except Exception as e:
+        return RenderResult('failed', error=str(e))
 
-def _add_ast_nodes(dot, node, parent_id=None):
+    dot_source = ast_to_dot(parsed_command)
+    key = ast_cache_key(dot_source, engine, fmt)
+    data = render_cache.get(key)
+    if data is not None:
+        return RenderResult('ready', data)
+    future = render_pool.submit(key, _render_graphviz, dot_source, fmt, key)
+    if future is None:
+        return RenderResult('busy')
+    return render_status(future, wait)
+
+def _add_ast_nodes(dot, node, parent_id=None, node_id='root'):
     """
-    Recursively builds the AST by adding nodes and edges to the Digraph.
+    Recursively builds the AST by adding nodes and edges to the graph.
     
     Args:
-        dot (Digraph): Graphviz graph object
+        dot (_TreeRecorder): Graph collecting nodes (node()) and edges (edge())
         node: Current node to process (tuple/dict/list/primitive)
         parent_id: ID of parent node for edge creation
+        node_id: ID for this node; children extend it ("root_1",
+                 "root_1_person", ...), so IDs are paths from the root and
+                 identical for equal trees
     
     Processing Logic:
         - Handles 4 node types: tuples, dicts, lists, and primitives
@@ -51,7 +435,6 @@ def _add_ast_nodes(dot, node, parent_id=None):
     
     # Tuple nodes represent command structures
     if isinstance(node, tuple):
-        node_id = str(id(node))  # Unique ID using memory address
         label = node[0]          # Command name (first element)
         
         # Truncate long labels with ellipsis
@@ -66,33 +449,32 @@ def _add_ast_nodes(dot, node, parent_id=None):
             dot.edge(parent_id, node_id)
         
         # Process all non-None children
-        for child in node[1:]:
+        for index, child in enumerate(node[1:], start=1):
             if child is None:
                 continue
                 
             # Recursive processing based on child type    
+            child_id = f"{node_id}_{index}"
             if isinstance(child, (tuple, dict, list)):
-                _add_ast_nodes(dot, child, node_id)
+                _add_ast_nodes(dot, child, node_id, child_id)
             else:
                 # Format primitive values
                 child_label = str(child)
                 if len(child_label) > max_label_length:
                     child_label = f"{child_label[:max_label_length]}..."
                 
-                child_id = f"{node_id}_{id(child)}"
                 dot.node(child_id, label=child_label)
                 dot.edge(node_id, child_id)
     
     # Dictionary nodes contain command details
     elif isinstance(node, dict):
-        node_id = str(id(node))
         dot.node(node_id, label="Details")
         
         if parent_id:
             dot.edge(parent_id, node_id)
         
         # Process each key-value pair
-        for key, value in node.items():
+        for key, value in _ordered_items(node):
             key_id = f"{node_id}_{key}"
             
             # Format value with multi-line handling
@@ -110,11 +492,10 @@ def _add_ast_nodes(dot, node, parent_id=None):
             
             # Recursively process complex values
             if isinstance(value, (tuple, dict, list)):
-                _add_ast_nodes(dot, value, key_id)
+                _add_ast_nodes(dot, value, key_id, f"{key_id}_value")
     
     # List nodes (less common in this grammar)
     elif isinstance(node, list):
-        node_id = str(id(node))
         dot.node(node_id, label="List")
         
         if parent_id:
@@ -124,10 +505,15 @@ def _add_ast_nodes(dot, node, parent_id=None):
         for index, item in enumerate(node):
             item_id = f"{node_id}_item{index}"
             if isinstance(item, (tuple, dict, list)):
-                _add_ast_nodes(dot, item, node_id)
+                _add_ast_nodes(dot, item, node_id, item_id)
             else:
                 item_label = str(item)
                 if len(item_label) > max_label_length:
                     item_label = f"{item_label[:max_label_length]}..."
                 dot.node(item_id, label=item_label)
-                dot.edge(node_id, item_id)
\ No newline at end of file
+                dot.edge(node_id, item_id)
+
+def _ordered_items(details):
+    """Dict items in canonical order: known keys first (_DETAIL_KEY_ORDER), then by name"""
+    rank = {key: index for index, key in enumerate(_DETAIL_KEY_ORDER)}
+    return sorted(details.items(), key=lambda item: (rank.get(item[0], len(rank)), str(item[0])))
@@ -0,0 +1,156 @@
+import argparse
+import json
+import sys
+from database import initialize_db, apply_booking_batch
+from lexer_parser import ParseFailure, parse_many
+from validation import validate_datetime
+from openai_integration import local_limit_warning
+from event_catalog import catalog
+from config import TICKET_LIMITS, BATCH_CHUNK_SIZE
+from command_processing import (booked_message, status_message, sold_out_message,
+                                not_found_message, cancelled_message)
+
+# Commands that change bookings and go through apply_booking_batch()
+_WRITE_COMMANDS = ('BOOK', 'CONFIRM', 'PAY', 'CANCEL')
+
+def read_commands(lines):
+    """
+    Extracts command strings from newline-delimited text or JSONL
+
+    Args:
+        lines (iterable): Lines of a file or request body. Each line is a
+            plain command, a JSON string, or a JSON object with a
+            "command" key. Blank lines and lines starting with '#' are skipped;
+            non-string JSON values are passed on as text, to fail per line.
+
+    Yields:
+        tuple: (line number, command text)
+    """
+    for number, line in enumerate(lines, start=1):
+        text = line.strip()
+        if not text or text.startswith('#'):
+            continue
+        if text[0] in '{"':
+            try:
+                value = json.loads(text)
+                text = str(value.get('command', '') if isinstance(value, dict) else value)
+            except json.JSONDecodeError:
+                pass
+        yield number, text
+
+def run_batch(commands, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Executes many commands with one database transaction per chunk
+
+    Args:
+        commands (iterable): (line number, command text) pairs, e.g. from
+                             read_commands(), or plain command strings
+        chunk_size (int): Commands per transaction
+
+    Returns:
+        list: One result dict per command:
+              {'line', 'command', 'ok', 'message', 'booking_id'}
+
+    Notes:
+        - No AI calls are made: limit warnings are templated and LIST is
+          answered from the event catalog
+        - VIEW BOOKINGS is not supported in batches; use /bookings/export
+    """
+    results = []
+    chunk = []
+    for number, item in enumerate(commands, start=1):
+        chunk.append(item if isinstance(item, tuple) else (number, item))
+        if len(chunk) >= chunk_size:
+            results.extend(_run_chunk(chunk))
+            chunk = []
+    if chunk:
+        results.extend(_run_chunk(chunk))
+    return results
+
+def _result(line, command, ok, message, booking_id=None):
+    return {'line': line, 'command': command, 'ok': ok, 'message': message, 'booking_id': booking_id}
+
+def _run_chunk(chunk):
+    """Parses and validates a chunk, then applies its writes in one transaction"""
+    results = []
+    operations = []   # (index into results, (action, details))
+    for (line, command), parsed in zip(chunk, parse_many(command for _, command in chunk)):
+        error = _validate(parsed)
+        if error:
+            results.append(_result(line, command, False, error))
+        elif parsed[0] == 'LIST':
+            listing = catalog.listing(parsed[1]) or f"No {parsed[1]} events in the catalog"
+            results.append(_result(line, command, True, listing))
+        else:
+            if parsed[0] == 'BOOK':
+                parsed = (parsed[0], catalog.with_event_date(parsed[1]))
+            results.append(None)
+            operations.append((len(results) - 1, parsed))
+
+    outcomes = apply_booking_batch([op for _, op in operations], TICKET_LIMITS)
+    for (index, (action, details)), outcome in zip(operations, outcomes):
+        line, command = chunk[index]
+        results[index] = _result(line, command, outcome.ok,
+                                 _outcome_message(action, details, outcome), outcome.booking_id)
+    return results
+
+def _validate(parsed):
+    """Returns an error message for commands that can't run in a batch, else None"""
+    if isinstance(parsed, ParseFailure):
+        return f"Error: {parsed.message}"
+    if not isinstance(parsed, tuple):
+        return "Error: Could not understand that command"
+    if parsed[0] == 'VIEW':
+        return "Error: View bookings is not supported in batch mode"
+    if parsed[0] == 'LIST':
+        return None
+    if parsed[0] not in _WRITE_COMMANDS:
+        return "Error: Unrecognized command"
+    details = parsed[1]
+    if not details.get('person'):
+        return "Error: Must specify a person"
+    if parsed[0] == 'BOOK' and 'date' in details:
+        return validate_datetime(details['date'], details.get('time'))
+    return None
+
+def _outcome_message(action, details, outcome):
+    """Builds the per-line message for an applied write"""
+    person, resource = details['person'], details['type']
+    if outcome.ok:
+        if action == 'BOOK':
+            return booked_message(person, outcome.booking_id)
+        return status_message(action, person)
+    if outcome.reason == 'limit':
+        return "WARNING: " + local_limit_warning(person, resource, outcome.count, 1)
+    if outcome.reason == 'sold_out':
+        return sold_out_message(resource, outcome.booking_id if action != 'BOOK' else None)
+    if outcome.reason == 'cancelled':
+        return cancelled_message(action, person, outcome.booking_id)
+    return not_found_message(resource, person, details.get('booking_id'))
+
+def main(argv=None):
+    """
+    Command-line entry point
+
+    Example:
+        python batch_processing.py imports.txt > results.jsonl
+    """
+    arg_parser = argparse.ArgumentParser(description="Run booking commands in bulk")
+    arg_parser.add_argument('file', help="Newline-delimited or JSONL command file ('-' for stdin)")
+    arg_parser.add_argument('--chunk-size', type=int, default=BATCH_CHUNK_SIZE,
+                            help="Commands per database transaction")
+    args = arg_parser.parse_args(argv)
+
+    initialize_db()
+    catalog.initialize()
+    handle = sys.stdin if args.file == '-' else open(args.file, encoding='utf-8')
+    with handle:
+        results = run_batch(read_commands(handle), args.chunk_size)
+    for result in results:
+        print(json.dumps(result, separators=(',', ':')))
+    failures = sum(not result['ok'] for result in results)
+    print(f"{len(results)} commands, {failures} failed", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
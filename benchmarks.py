@@ -0,0 +1,278 @@
+import argparse
+import os
+import string
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Commands as users type them: every command form, mixed case, quoted and
+# multi-word names, and place names that contain keywords (kingston, toronto)
+COMMAND_CORPUS = [
+    'List concert tickets in my area',
+    'list football tickets in my area',
+    'LIST TRAIN TICKETS IN MY AREA',
+    'list airline tickets in my area',
+    'Book train from Kingston to Montego Bay on 2025-06-14 at 09:30 for "John Smith"',
+    'book train from spanish town to may pen on 2025-07-01 at 17:45 for lisa grant',
+    'Book airline from Kingston to Toronto on 2025-08-20 at 06:15 for Abraham Lincoln',
+    'book airline from montego bay to fort lauderdale on 2025-12-24 at 22:00 for "Mary Ann"',
+    'Book after hours concert for lisa grant',
+    'book "Reggae Sumfest" concert for Shemar',
+    'book taylor swift lover fest concert for abraham',
+    'Book Reggae Boyz vs Mexico football match for "Tony Stark"',
+    'book arsenal versus chelsea football match for bruce wayne',
+    'Confirm concert for lisa grant',
+    'pay train #12 for "John Smith"',
+    'cancel airline #7 for abraham lincoln',
+    'Cancel football for tony stark',
+    'View bookings',
+    'view BOOKINGS',
+]
+
+def _token_count(lexer, corpus):
+    """Tokenizes every command in corpus and returns the number of tokens"""
+    count = 0
+    for command in corpus:
+        lexer.input(command)
+        for _ in iter(lexer.token, None):
+            count += 1
+    return count
+
+def bench_lexer(repeat=2000):
+    """
+    Compares tokenizer throughput of the keyword-table and legacy lexers
+
+    Args:
+        repeat (int): Passes over COMMAND_CORPUS per lexer
+
+    Returns:
+        dict: Mode -> tokens/second
+    """
+    from lexer_parser import build_lexer
+    results = {}
+    for mode in ('legacy', 'keywords'):
+        lexer = build_lexer(mode)
+        _token_count(lexer, COMMAND_CORPUS)  # Warm up
+        start = time.perf_counter()
+        tokens = sum(_token_count(lexer, COMMAND_CORPUS) for _ in range(repeat))
+        elapsed = time.perf_counter() - start
+        results[mode] = tokens / elapsed
+        print(f"{mode:>9}: {tokens} tokens in {elapsed:.2f}s = {results[mode]:,.0f} tokens/s")
+    print(f"  speedup: {results['keywords'] / results['legacy']:.2f}x")
+    return results
+
+# Dependencies are imported first so only lexer/parser construction is timed
+_IMPORT_SNIPPET = ("import config, ply.lex, ply.yacc, time; start = time.perf_counter(); "
+                   "import lexer_parser; print(time.perf_counter() - start)")
+
+def _import_time(cwd, optimize, runs):
+    """Average seconds for a fresh interpreter to import lexer_parser"""
+    env = dict(os.environ, PARSER_OPTIMIZE='1' if optimize else '0')
+    total = 0.0
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', _IMPORT_SNIPPET], cwd=cwd, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        total += float(output.split()[-1])
+    return total / runs
+
+def bench_import(runs=10):
+    """
+    Measures lexer_parser import time in fresh interpreters
+
+    Cases:
+        prebuilt: PARSER_OPTIMIZE=1, tables loaded without validation
+        validated: PARSER_OPTIMIZE=0 with up-to-date tables (PLY validates
+                   the rules and compares signatures)
+        regenerated: PARSER_OPTIMIZE=0 without tables, as in a fresh
+                     checkout or a read-only directory
+
+    Returns:
+        dict: Case -> average seconds
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = {
+        'prebuilt': _import_time(here, True, runs),
+        'validated': _import_time(here, False, runs),
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in ('lexer_parser.py', 'legacy_lexer.py', 'config.py'):
+            shutil.copy(os.path.join(here, name), workdir)
+        total = 0.0
+        for _ in range(runs):
+            for leftover in ('parsetab.py', 'parser.out'):
+                if os.path.exists(os.path.join(workdir, leftover)):
+                    os.remove(os.path.join(workdir, leftover))
+            shutil.rmtree(os.path.join(workdir, '__pycache__'), ignore_errors=True)
+            total += _import_time(workdir, False, 1)
+        results['regenerated'] = total / runs
+    for case, seconds in results.items():
+        print(f"{case:>11}: {seconds * 1000:.1f} ms")
+    return results
+
+def _letters(number):
+    """Spells number in base 26 with letters (names can't contain digits)"""
+    name = ''
+    while True:
+        number, digit = divmod(number, 26)
+        name = string.ascii_lowercase[digit] + name
+        if not number:
+            return name
+
+def _stress_commands(count):
+    """Corpus commands with a unique person name each, so results differ per command"""
+    commands = []
+    for index in range(count):
+        template = COMMAND_CORPUS[index % len(COMMAND_CORPUS)].lower()
+        if ' for ' in template:
+            template = template.rsplit(' for ', 1)[0] + f" for guest {_letters(index)}"
+        commands.append(template)
+    return commands
+
+def stress_parse(threads=16, parses=20000):
+    """
+    Parses commands from many threads at once and checks every result
+
+    Compares the thread-safe lexer_parser.parse() with calling the shared
+    module-level parser directly. Each result must equal the one produced
+    by a single-threaded run.
+
+    Raises:
+        RuntimeError: If any thread-safe parse returned a wrong result
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import lexer_parser
+
+    commands = _stress_commands(parses)
+    expected = [lexer_parser.parse(command) for command in commands]
+
+    def shared_parse(command):
+        return lexer_parser.parser.parse(command, lexer=lexer_parser.lexer)
+
+    results = {}
+    for name, parse in (('shared', shared_parse), ('thread-safe', lexer_parser.parse)):
+        def check(index):
+            try:
+                return parse(commands[index]) == expected[index]
+            except Exception:
+                return False
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            wrong = sum(not ok for ok in pool.map(check, range(parses), chunksize=64))
+        elapsed = time.perf_counter() - start
+        results[name] = wrong
+        print(f"{name:>11}: {parses} parses on {threads} threads in {elapsed:.2f}s, {wrong} wrong")
+    if results['thread-safe']:
+        raise RuntimeError(f"{results['thread-safe']} concurrent parses returned wrong results")
+    return results
+
+def bench_ast(repeat=200):
+    """
+    Measures builtin SVG AST renders per second (render cache bypassed)
+
+    Returns:
+        float: Renders per second
+    """
+    from ast_generator import render_svg
+    from lexer_parser import parse_command
+    trees = [parse_command(command) for command in COMMAND_CORPUS]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for tree in trees:
+            render_svg(tree)
+    elapsed = time.perf_counter() - start
+    rate = repeat * len(trees) / elapsed
+    print(f"  builtin svg: {rate:,.0f} renders/s")
+    return rate
+
+def _cancel_rebook_scenario():
+    """
+    Books a person up to the concert limit, cancels one booking and books
+    again, through the interactive and the batch code paths, then checks
+    the seats left in the catalog listing
+
+    Runs against BOOKINGS_DB; check_cancel_rebook() points it at a scratch file.
+    """
+    import datetime
+    from batch_processing import run_batch
+    from command_processing import run_command
+    from config import TICKET_LIMITS
+    from database import initialize_db, verify_ticket_counts
+    from event_catalog import Event, catalog
+    from lexer_parser import parse_command
+
+    def interactive(command):
+        result = run_command(command, parse_command(command), concurrent=False)
+        return result.status == 'ok', result.message
+
+    def batch(command):
+        result = run_batch([command])[0]
+        return result['ok'], result['message']
+
+    initialize_db()
+    catalog.initialize()
+    event_date = (datetime.date.today() + datetime.timedelta(days=30)).isoformat()
+    capacity = 20
+    catalog.upsert([Event('concert', 'Sumfest', event_date, '20:00', None, capacity, capacity, None)])
+    failures = []
+    for person, execute in (('lisa grant', interactive), ('john brown', batch)):
+        for _ in range(TICKET_LIMITS['concert']):
+            execute(f'book sumfest concert for {person}')
+        execute(f'cancel concert for {person}')
+        ok, message = execute(f'book sumfest concert for {person}')
+        if not ok:
+            failures.append(f"{person}: rebooking after a cancel was refused: {message}")
+    expected = capacity - 2 * TICKET_LIMITS['concert']
+    remaining = catalog.events('concert')[0].tickets_remaining
+    if remaining != expected:
+        failures.append(f"listing shows {remaining} seats left, expected {expected}")
+    mismatches = verify_ticket_counts()
+    if mismatches:
+        failures.append(f"ticket counter out of sync: {mismatches}")
+    if failures:
+        raise RuntimeError("; ".join(failures))
+    print("  cancelling a booking frees a ticket and a seat (interactive and batch)")
+
+def check_cancel_rebook():
+    """
+    Checks that cancelling a booking frees a ticket under the per-person
+    limit and returns its seat to the inventory
+
+    Raises:
+        RuntimeError: If the rebooking is refused, the listing shows the
+                      wrong seat count or the counter disagrees with the
+                      database
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, BOOKINGS_DB=os.path.join(workdir, 'bookings.db'))
+        completed = subprocess.run([sys.executable, '-c', 'import benchmarks; benchmarks._cancel_rebook_scenario()'],
+                                   cwd=here, env=env, capture_output=True, text=True)
+    print(completed.stdout, end='')
+    if completed.returncode:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+BENCHMARKS = {
+    'lexer': bench_lexer,
+    'import': bench_import,
+    'parse-threads': stress_parse,
+    'ast': bench_ast,
+    'cancel-rebook': check_cancel_rebook,
+}
+
+def main(argv=None):
+    """Command line entry point: python benchmarks.py [name ...]"""
+    arg_parser = argparse.ArgumentParser(description="Run performance benchmarks")
+    arg_parser.add_argument('names', nargs='*', metavar='name',
+                            help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    args = arg_parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        arg_parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in args.names or BENCHMARKS:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+from html import escape
+from flask import Blueprint, Response, jsonify, request, stream_with_context, url_for
+from database import iter_bookings
+from paging import booking_filters, read_page
+from renderers import BOOKING_TABLE_HEADER, booking_row_html, format_booking
+from batch_processing import read_commands, run_batch
+
+# Booking listing and bulk routes shared by both Flask entry points
+bookings_bp = Blueprint('bookings', __name__)
+
+def next_page_url(after_id):
+    """URL of the /bookings page following booking after_id"""
+    return url_for('bookings.bookings_page', after=after_id)
+
+@bookings_bp.route('/bookings')
+def bookings_page():
+    """
+    Paged view of bookings
+
+    Query Parameters:
+        after (int): Cursor from the previous page's "Next page" link
+        limit (int): Page size (default 50, max 500)
+        resource, person, status: Exact-match filters
+        format: 'html' (default) or 'text'
+
+    Notes:
+        - Keyset pagination: each page is one indexed query
+        - The page is streamed row by row to the client
+    """
+    rows, next_url = read_page('bookings.bookings_page')
+    headers = {'Link': f'<{next_url}>; rel="next"'} if next_url else {}
+    if request.args.get('format') == 'text':
+        def generate_text():
+            for row in rows:
+                yield format_booking(row)
+            if next_url:
+                yield f"Next page: {next_url}\n"
+        return Response(generate_text(), mimetype='text/plain', headers=headers)
+    return Response(_html_page(rows, next_url), mimetype='text/html', headers=headers)
+
+@bookings_bp.route('/bookings/export')
+def bookings_export():
+    """
+    Streams every booking matching the filters as plain text
+
+    Notes:
+        - Rows are fetched in batches with iter_bookings(), so memory use
+          stays flat no matter how large the table grows
+    """
+    filters = booking_filters()
+
+    def generate():
+        for row in iter_bookings(**filters):
+            yield format_booking(row)
+
+    return Response(stream_with_context(generate()), mimetype='text/plain')
+
+def _html_page(rows, next_url):
+    """Yields the page as HTML fragments"""
+    yield ("<!doctype html><html><head><title>Bookings</title></head><body>"
+           "<h1>Bookings</h1>" + BOOKING_TABLE_HEADER)
+    for row in rows:
+        yield booking_row_html(row)
+    yield "</table>"
+    if not rows:
+        yield "<p>No bookings found.</p>"
+    if next_url:
+        yield f"<p><a href='{escape(next_url)}'>Next page</a></p>"
+    yield "</body></html>"
+
+@bookings_bp.route('/batch', methods=['POST'])
+def batch_commands():
+    """
+    Runs many commands in one request
+
+    Body:
+        - JSON array of command strings (or {"commands": [...]}), or
+        - text/plain newline-delimited / JSONL commands
+
+    Returns:
+        JSON: {"results": [...per-line results...], "total": n, "failed": n}
+    """
+    if request.is_json:
+        payload = request.get_json(silent=True)
+        commands = payload.get('commands') if isinstance(payload, dict) else payload
+        if not isinstance(commands, list):
+            return jsonify(error="Expected a JSON array of commands"), 400
+        results = run_batch(str(command) for command in commands)
+    else:
+        results = run_batch(read_commands(request.get_data(as_text=True).splitlines()))
+    failed = sum(not result['ok'] for result in results)
+    return jsonify(results=results, total=len(results), failed=failed)
@@ -0,0 +1,14 @@
+# Regenerates the prebuilt lexer and parser tables (lextab.py, parsetab.py)
+#
+# Run after changing any token rule or grammar production:
+#     python build_tables.py
+# The grammar is loaded in development mode, since the tables being
+# replaced no longer match it.
+import os
+os.environ['PARSER_OPTIMIZE'] = '0'
+
+from lexer_parser import build_tables
+
+if __name__ == '__main__':
+    for path in build_tables():
+        print(f"Wrote {path}")
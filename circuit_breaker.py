@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import deque
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker for calls to an unreliable dependency
+
+    States:
+        - closed: calls go through; outcomes are recorded in a sliding window
+        - open: calls are refused immediately until the cooldown elapses
+        - half_open: one probe call is let through; success closes the
+          circuit, failure re-opens it for another cooldown
+
+    Args:
+        failure_rate (float): Fraction of failed calls (0-1) that trips the breaker
+        window (int): Number of recent calls the failure rate is computed over
+        min_calls (int): Calls required in the window before the rate is trusted
+        cooldown (float): Seconds to stay open before probing again
+
+    Notes:
+        - Thread-safe; one instance is shared by every request thread
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate=0.5, window=20, min_calls=5, cooldown=30.0):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self._outcomes = deque(maxlen=window)  # True = success
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        """Moves open -> half_open once the cooldown elapses; caller holds the lock"""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self):
+        """
+        Returns True if a call may be made now
+
+        Notes:
+            - In half_open only the first caller gets through (the probe);
+              everyone else is refused until the probe reports back
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._outcomes.clear()
+                self._state = self.CLOSED
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trip()
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if (len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_rate):
+                self._trip()
+
+    def release(self):
+        """
+        Reports a call that never reached the dependency (e.g. missing
+        credentials): nothing is recorded, but a half_open probe slot is
+        freed for the next caller
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _trip(self):
+        """Opens the circuit; caller holds the lock"""
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self._outcomes.clear()
+
+    def reset(self):
+        """Forces the circuit closed and forgets recorded outcomes"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._outcomes.clear()
+            self._probe_in_flight = False
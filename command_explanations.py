@@ -0,0 +1,72 @@
+# Deterministic, template-based explanations of parsed commands.
+# Builds the same one-sentence summary the LLM used to produce, straight
+# from the parser's tuples, so explaining a command costs microseconds.
+
+# Human-friendly nouns for each resource type
+_RESOURCE_NOUNS = {
+    'concert': 'concert',
+    'football': 'football match',
+    'train': 'train',
+    'airline': 'flight',
+}
+
+# Verb phrases for the status-change commands
+_STATUS_PHRASES = {
+    'CONFIRM': 'confirm',
+    'PAY': 'pay for',
+    'CANCEL': 'cancel',
+}
+
+def _title(value):
+    """Title-cases a parsed (lowercased) name or place for display"""
+    return str(value).title()
+
+def describe_command(parsed_command):
+    """
+    Builds a one-sentence explanation of a parsed command
+    
+    Args:
+        parsed_command (tuple): Structured output from lexer_parser.parser
+    
+    Returns:
+        str: Explanation sentence, or None if the shape is not recognised
+             (callers may then fall back to the LLM)
+    
+    Examples:
+        >>> describe_command(('LIST', 'concert'))
+        'You want to see the concert tickets available in your area.'
+    """
+    if not isinstance(parsed_command, tuple) or not parsed_command:
+        return None
+
+    command_type = parsed_command[0]
+    details = parsed_command[1] if len(parsed_command) > 1 else None
+
+    if command_type == 'LIST' and isinstance(details, str):
+        return f"You want to see the {details} tickets available in your area."
+
+    if command_type == 'VIEW':
+        return "You want to view all current bookings."
+
+    if not isinstance(details, dict):
+        return None
+
+    resource = details.get('type')
+    person = details.get('person')
+    noun = _RESOURCE_NOUNS.get(resource, resource)
+
+    if command_type == 'BOOK' and resource in ('train', 'airline'):
+        return (f"You want to book a {noun} ticket from {_title(details.get('from'))} "
+                f"to {_title(details.get('to'))} on {details.get('date')} at "
+                f"{details.get('time')} for {_title(person)}.")
+
+    if command_type == 'BOOK' and resource in ('concert', 'football'):
+        return (f"You want to book a ticket to the {_title(details.get('name'))} "
+                f"{noun} for {_title(person)}.")
+
+    if command_type in _STATUS_PHRASES and resource:
+        booking_id = details.get('booking_id')
+        which = f"{noun} booking #{booking_id}" if booking_id is not None else f"{noun} booking"
+        return f"You want to {_STATUS_PHRASES[command_type]} the {which} for {_title(person)}."
+
+    return None
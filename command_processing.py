@@ -1,93 +1,170 @@
 from database import *
 from openai_integration import *
 from validation import *
-from lexer_parser import parser
-from ast_generator import generate_ast
-import tkinter as tk  # GUI toolkit for output display
+from lexer_parser import ParseFailure
+from config import TICKET_LIMITS, AI_EXPLAIN_FALLBACK, AI_CONCURRENT_MODE
+from command_explanations import describe_command
+from event_catalog import catalog, format_listing
+from collections import namedtuple
+from itertools import chain
+from renderers import render_text, render_tk
 
-def process_command(raw_command, parsed_command, output_box=None):
+# Outcome of one command, independent of how it is displayed
+#   status: 'ok', 'warning' (e.g. ticket limit reached) or 'error'
+#   message: human readable outcome, without trailing newline
+#   data: structured details for programmatic clients (dict or None)
+#   rows: booking rows (BOOKING_COLUMNS layout) for VIEW; may be a lazy iterator
+#   explanation: natural language explanation of the command
+CommandResult = namedtuple('CommandResult', ['status', 'message', 'data', 'rows', 'explanation'],
+                           defaults=[None, None, None])
+
+def run_command(raw_command, parsed_command, concurrent=None, cancel=None):
+    """
+    Runs one command and returns its outcome as data
+
+    Args:
+        raw_command (str): Original user input string
+        parsed_command (tuple/ParseFailure/str): Output of
+            lexer_parser.parse_command(), or an error string
+        concurrent (Optional[bool]): Run AI calls (the explanation and any
+            made by the command) on the worker pool with a deadline;
+            defaults to config.AI_CONCURRENT_MODE
+        cancel (Optional[threading.Event]): Set to abandon the command;
+            checked before any booking is written
+
+    Returns:
+        CommandResult: Status, message, structured data, booking rows and
+                       explanation; never raises
+
+    Workflow:
+        1. Input validation
+        2. Natural language explanation (templated; LLM only as opt-in
+           fallback for unparseable input, started in the background)
+        3. Command-specific processing
+        4. Database operations
+        5. Explanation collected (placeholder if past its deadline)
+
+    Notes:
+        - Safe to call from Flask request threads and the Tk GUI; in
+          concurrent mode AI calls inside handlers are bounded by
+          config.AI_CALL_DEADLINE
+        - A cancelled command returns an error result without changing
+          any booking, unless its write had already been made
+    """
+    if concurrent is None:
+        concurrent = AI_CONCURRENT_MODE
+    if not raw_command:
+        return CommandResult('error', "Error: Empty command")
+
+    explanation = None
+    try:
+        # Explain parsed commands from templates; the LLM is only consulted
+        # for input the parser could not handle, and only when enabled
+        explanation = describe_command(parsed_command)
+        explanation_future = None
+        if explanation is None and AI_EXPLAIN_FALLBACK:
+            if concurrent:
+                explanation_future = submit_ai_call(explain_user_command, raw_command, parsed_command)
+            else:
+                explanation = explain_user_command(raw_command, parsed_command)
+
+        # The command runs while any explanation request is in flight
+        result = _dispatch_command(parsed_command, concurrent, cancel)
+        if explanation_future is not None and not _cancelled(cancel):
+            explanation = resolve_ai_call(explanation_future)
+        return result._replace(explanation=explanation)
+
+    except Exception as e:
+        return CommandResult('error', f"System Error: {str(e)}", explanation=explanation)
+
+def process_command(raw_command, parsed_command, output_box=None, concurrent=None):
     """
     Main command processing pipeline that handles the complete workflow from
     raw input to system response. Integrates all system components.
 
     Args:
         raw_command (str): Original user input string
-        parsed_command (tuple/str): Structured output from parser or error string
+        parsed_command (tuple/ParseFailure/str): See run_command()
         output_box (Optional[tk.scrolledtext]): GUI text widget for displaying results
-    
-    Workflow:
-        1. Input validation
-        2. Natural language explanation
-        3. AST generation
-        4. Command-specific processing
-        5. Database operations
-        6. Output display
+        concurrent (Optional[bool]): See run_command()
+
+    Returns:
+        str: Formatted output when no output_box is given
+
+    Notes:
+        - Front ends that need structured output call run_command() and
+          pick a renderer from renderers.py
+    """
+    result = run_command(raw_command, parsed_command, concurrent)
+    if output_box:
+        render_tk(output_box, result)
+        return None
+    return render_result(render_text, result)
+
+def render_result(renderer, result, *args, **kwargs):
+    """
+    Applies a renderer from renderers.py to a CommandResult
+
+    Notes:
+        - VIEW rows are read lazily while rendering, after run_command()
+          has returned; a database error at that point is rendered as a
+          'System Error' result instead of propagating
     """
     try:
-        # Input validation
-        if not raw_command:
-            message = "Error: Empty command\n"
-            if output_box:
-                output_box.insert(tk.END, message)
-                return
-            return message
-            
-        # Generate natural language explanation using AI
-        explanation = explain_user_command(raw_command)
-        output = f"\nExplanation: {explanation}\n"
-        if output_box:
-            output_box.insert(tk.END, output)
-        
-        # Handle parser errors
-        if isinstance(parsed_command, str) and parsed_command.startswith("Error"):
-            error_msg = parsed_command + "\n"
-            if output_box:
-                output_box.insert(tk.END, error_msg)
-                return
-            return output + error_msg
-            
-        # Generate and display abstract syntax tree visualization
-        #ast_image = generate_ast(parsed_command)
-        #output_box.insert(tk.END, f"\nAST generated: {ast_image}\n")
-        
-        # Command routing
-        command_type = parsed_command[0]
+        return renderer(result, *args, **kwargs)
+    except Exception as e:
+        failure = CommandResult('error', f"System Error: {str(e)}", explanation=result.explanation)
+        return renderer(failure, *args, **kwargs)
+
+def _cancelled(cancel):
+    """True if the cancel event passed to run_command() has been set"""
+    return cancel is not None and cancel.is_set()
+
+# Returned instead of writing when a command was cancelled in flight
+_CANCELLED_RESULT = CommandResult('error', "Cancelled before any booking was changed")
+
+def _dispatch_command(parsed_command, concurrent=None, cancel=None):
+    """
+    Routes a parsed command to its handler
+
+    Args:
+        concurrent (Optional[bool]): Passed to AI calls, see run_command()
+        cancel (Optional[threading.Event]): See run_command()
+
+    Returns:
+        CommandResult: Handler outcome (explanation not yet filled in)
+    """
+    # Handle parser errors
+    if isinstance(parsed_command, ParseFailure):
+        return CommandResult('error', f"Error: {parsed_command.message}",
+                             {'errors': [error._asdict() for error in parsed_command.errors]})
+    if isinstance(parsed_command, str) and parsed_command.startswith("Error"):
+        return CommandResult('error', parsed_command)
+    if not isinstance(parsed_command, tuple):
+        return CommandResult('error', "Error: Could not understand that command. Type 'help' for instructions.")
+
+    # Command routing
+    command_type = parsed_command[0]
+    
+    if command_type == 'LIST':
+        return _handle_list_command(parsed_command, concurrent)
         
-        if command_type == 'LIST':
-            result = _handle_list_command(parsed_command, output_box)
+    elif command_type == 'BOOK':
+        return _handle_book_command(parsed_command, concurrent, cancel)
             
-        elif command_type == 'BOOK':
-            result = _handle_book_command(parsed_command, output_box)
-                
-        elif command_type in ['CONFIRM', 'PAY', 'CANCEL']:
-            result = _handle_status_command(parsed_command, output_box)
-                
-        elif command_type == 'VIEW':
-            result = _handle_view_command(output_box)
+    elif command_type in ['CONFIRM', 'PAY', 'CANCEL']:
+        return _handle_status_command(parsed_command, cancel)
             
-        else:
-            result = "Unrecognized command. Type 'help' for instructions.\n"
-            if output_box:
-                output_box.insert(tk.END, result)
-            else:
-                return output + result
+    elif command_type == 'VIEW':
+        return _handle_view_command()
         
-        # Return combined output if not using output_box
-        if not output_box:
-            return output + result
-            
-    except Exception as e:
-        error_msg = f"System Error: {str(e)}\n"
-        if output_box:
-            output_box.insert(tk.END, error_msg)
-        else:
-            return output + error_msg if 'output' in locals() else error_msg
+    return CommandResult('error', "Unrecognized command. Type 'help' for instructions.")
 
 # --------------------------
 # Command Handler Functions
 # --------------------------
 
-def _handle_list_command(parsed_command, output_box):
+def _handle_list_command(parsed_command, concurrent=None):
     """
     Processes LIST commands to show available events/tickets
     """
@@ -95,18 +172,18 @@ def _handle_list_command(parsed_command, output_box):
     valid_events = ['concert', 'football', 'train', 'airline']
     
     if event_type not in valid_events:
-        message = f"Error: Can only list {', '.join(valid_events)} tickets\n"
-        if output_box:
-            output_box.insert(tk.END, message)
-        return message
+        return CommandResult('error', f"Error: Can only list {', '.join(valid_events)} tickets")
         
-    # Get real-time event information from external source
-    event_info = get_real_time_info(event_type)
-    if output_box:
-        output_box.insert(tk.END, event_info + "\n")
-    return event_info + "\n"
+    # Serve from the local event catalog; only ask the AI when it has
+    # nothing for this event type yet
+    events = catalog.events(event_type)
+    if events:
+        return CommandResult('ok', format_listing(events),
+                             {'event_type': event_type, 'events': [event._asdict() for event in events]})
+    event_info = call_with_deadline(get_real_time_info, event_type, concurrent=concurrent)
+    return CommandResult('ok', event_info, {'event_type': event_type, 'events': None})
 
-def _handle_book_command(parsed_command, output_box):
+def _handle_book_command(parsed_command, concurrent=None, cancel=None):
     """
     Processes BOOK commands with validation and database operations
     """
@@ -114,38 +191,42 @@ def _handle_book_command(parsed_command, output_box):
     
     # Person validation
     if 'person' not in details or not details['person']:
-        message = "Error: Must specify a person for booking\n"
-        if output_box:
-            output_box.insert(tk.END, message)
-        return message
+        return CommandResult('error', "Error: Must specify a person for booking")
         
     # Date/time validation
     if 'date' in details:
         error = validate_datetime(details['date'], details.get('time'))
         if error:
-            if output_box:
-                output_box.insert(tk.END, error + "\n")
-            return error + "\n"
+            return CommandResult('error', error)
     
-    # Ticket limit enforcement
+    # Ticket limit enforcement: the in-memory counter predicts a refusal
+    # (and prepares its warning); the authoritative check and insert run
+    # in one transaction, so a stale counter never refuses a valid booking
     event_type = details['type']
     person = details['person']
-    within_limit, warning = check_ticket_limit(person, event_type)
-    
-    if not within_limit:
-        message = f"WARNING: {warning}\n"
-        if output_box:
-            output_box.insert(tk.END, message)
-        return message
+    data = {'resource': event_type, 'person': person, 'limit': TICKET_LIMITS.get(event_type, 0)}
+    predicted_count = get_active_ticket_count(person, event_type)
+    within_limit, warning = check_ticket_limit(person, event_type, concurrent=concurrent)
+
+    details = catalog.with_event_date(details)
+    if _cancelled(cancel):
+        return _CANCELLED_RESULT
+    reservation = reserve_booking(event_type, details, data['limit'])
+    data['active_tickets'] = reservation.count
+    if reservation.sold_out:
+        return CommandResult('error', sold_out_message(event_type), data)
+    if not reservation.reserved:
+        if within_limit or reservation.count != predicted_count:
+            warning = call_with_deadline(
+                generate_ai_warning, person, event_type, reservation.count, 1,
+                placeholder=local_limit_warning(person, event_type, reservation.count, 1),
+                concurrent=concurrent)
+        return CommandResult('warning', f"WARNING: {warning}", data)
             
-    # Database operation
-    add_booking(event_type, details, "BOOK", "Reserved")
-    message = f"Added booking for {person}\n"
-    if output_box:
-        output_box.insert(tk.END, message)
-    return message
+    data['booking_id'] = reservation.booking_id
+    return CommandResult('ok', booked_message(person, reservation.booking_id), data)
 
-def _handle_status_command(parsed_command, output_box):
+def _handle_status_command(parsed_command, cancel=None):
     """
     Processes status change commands (CONFIRM/PAY/CANCEL)
     """
@@ -153,44 +234,64 @@ def _handle_status_command(parsed_command, output_box):
     data = parsed_command[1]
     
     if 'person' not in data or not data['person']:
-        message = "Error: Must specify a person\n"
-        if output_box:
-            output_box.insert(tk.END, message)
-        return message
+        return CommandResult('error', "Error: Must specify a person")
         
-    update_booking_status(data['type'], data['person'], action.capitalize())
-    message = f"Booking {action.lower()}ed for {data['person']}\n"
-    if output_box:
-        output_box.insert(tk.END, message)
-    return message
+    booking_id = data.get('booking_id')
+    new_status = ACTION_STATUSES[action]
+    if _cancelled(cancel):
+        return _CANCELLED_RESULT
+    update = update_booking_status(data['type'], data['person'], new_status, booking_id)
+    result_data = {'resource': data['type'], 'person': data['person'],
+                   'booking_id': update.booking_id if update.booking_id is not None else booking_id,
+                   'status': new_status if update.updated else None}
+    if update.sold_out:
+        return CommandResult('error', sold_out_message(data['type'], update.booking_id), result_data)
+    if update.cancelled:
+        return CommandResult('warning', cancelled_message(action, data['person'], update.booking_id),
+                             result_data)
+    if not update.updated:
+        return CommandResult('error', not_found_message(data['type'], data['person'], booking_id),
+                             result_data)
+    return CommandResult('ok', status_message(action, data['person']), result_data)
 
-def _handle_view_command(output_box):
+def _handle_view_command():
     """
     Processes VIEW BOOKINGS command to display all reservations
+
+    Notes:
+        - Rows are a lazy iter_bookings() stream, so the table is never
+          loaded into memory at once
     """
-    message = "\nCurrent Bookings:\n"
-    if output_box:
-        output_box.insert(tk.END, message)
-    else:
-        output = message
-        
-    bookings = list_bookings()
-    
-    if not bookings:
-        message = "No bookings found.\n"
-        if output_box:
-            output_box.insert(tk.END, message)
-        return message
-    else:
-        for booking in bookings:
-            message = (
-                f"ID: {booking[0]}, "
-                f"Resource: {booking[1]}, "
-                f"Details: {booking[3]}, "
-                f"Status: {booking[4]}\n"
-            )
-            if output_box:
-                output_box.insert(tk.END, message)
-            else:
-                output += message
-        return output if not output_box else None
\ No newline at end of file
+    rows = iter_bookings()
+    first = next(rows, None)
+    if first is None:
+        return CommandResult('ok', "No bookings found.")
+    return CommandResult('ok', "Current Bookings:", rows=chain([first], rows))
+
+# --------------------------
+# Outcome Messages
+# --------------------------
+# Shared by the handlers above and batch_processing, so a command reads the
+# same whether it was typed or imported
+
+def booked_message(person, booking_id):
+    return f"Added booking #{booking_id} for {person}"
+
+def status_message(action, person):
+    return f"Booking {action.lower()}ed for {person}"
+
+def sold_out_message(resource, booking_id=None):
+    """booking_id is given when reinstating a cancelled booking"""
+    if booking_id is not None:
+        return f"Sorry, there are no {resource} tickets left to reinstate booking #{booking_id}"
+    return f"Sorry, there are no {resource} tickets left for that booking"
+
+def not_found_message(resource, person, booking_id=None):
+    reference = f" #{booking_id}" if booking_id is not None else ""
+    return f"Error: No such {resource} booking{reference} for {person}"
+
+def cancelled_message(action, person, booking_id):
+    """Message for a status change left undone because the booking is cancelled"""
+    if action == 'CANCEL':
+        return f"Booking #{booking_id} for {person} is already cancelled"
+    return f"Booking #{booking_id} for {person} is cancelled; name it as #{booking_id} to reinstate it"
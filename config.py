@@ -1,4 +1,5 @@
 # Configuration and constants for the Ticket Booking System
+import os
 
 # Ticket Limits Configuration
 # --------------------------
@@ -29,19 +30,130 @@ def show_help():
     - List [concert|football|train|airline] tickets in my area
     - Book train|airline from [location] to [location] on [date] at [time] for [name]
     - Book [event name] concert|football match for [name]
-    - Confirm|Pay|Cancel [event type] for [name]
+    - Confirm|Pay|Cancel [event type] [#booking id] for [name]
     - View bookings
 
 GENERAL NOTES:
     - Dates must be in YYYY-MM-DD format (e.g., 2025-04-15)
     - Times must be in HH:MM 24-hour format (e.g., 14:30)
     - Names can be in quotes for multi-word names (e.g., "John Smith")
+    - Booking ids (shown by View bookings) pick a specific booking,
+      e.g. Cancel concert #12 for "John Smith"; without one the most
+      recent booking that is not cancelled is used, so reinstating a
+      cancelled booking needs its id
     - TICKET LIMITS
     Max 4 concert tickets per person
     Max 6 football tickets per person
     Max 10 train tickets per person
     Max 4 airline tickets per person"""
 
+# Database Configuration
+# ----------------------
+# Location of the SQLite file and sizing of the shared connection pool.
+# Connections are long-lived and reused across requests/threads, so the pool
+# size bounds how many threads can hold a connection at the same time.
+DB_PATH = os.getenv("BOOKINGS_DB", "bookings.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))   # Max pooled connections
+DB_POOL_TIMEOUT = 30                                 # Seconds to wait for a free connection
+DB_CACHE_SIZE_KB = 8192                              # Page cache per connection (PRAGMA cache_size)
+
+# Default seats per departure (train/airline, keyed by route, date and time)
+# or per event. Events found in the event catalog use the catalog capacity
+# instead; None means unlimited.
+INVENTORY_DEFAULT_CAPACITY = {
+    'concert': None,
+    'football': None,
+    'train': int(os.getenv("TRAIN_CAPACITY", "200")),
+    'airline': int(os.getenv("AIRLINE_CAPACITY", "150")),
+}
+
+# Commands applied per database transaction by batch_processing.py
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "500"))
+
+# Seconds before the in-memory ticket counter index is rebuilt from the
+# database. Leave at 0 for a single process; set it when several processes
+# write to the same bookings.db so each picks up the others' bookings.
+TICKET_COUNTER_MAX_AGE = float(os.getenv("TICKET_COUNTER_MAX_AGE", "0"))
+
+# AI Response Cache Configuration
+# -------------------------------
+# Per call type TTL (seconds) and LRU size for cached OpenAI responses.
+# Set AI_CACHE_DB to a file path to persist the cache across restarts.
+AI_CACHE_SETTINGS = {
+    'explanation': {'ttl': 24 * 3600, 'max_entries': 2048},  # Deterministic per command
+    'events': {'ttl': 15 * 60, 'max_entries': 16},           # Listings should stay fresh
+    'warning': {'ttl': 3600, 'max_entries': 512},            # Keyed on person/count
+}
+AI_CACHE_DB = os.getenv("AI_CACHE_DB")  # None keeps the cache in memory only
+
+# Parsed commands are explained from templates without calling the LLM.
+# Enable this to ask the LLM to explain input the parser could not handle.
+AI_EXPLAIN_FALLBACK = os.getenv("AI_EXPLAIN_FALLBACK", "0") == "1"
+
+# Concurrent AI execution: OpenAI calls run on a worker pool alongside the
+# command itself and are abandoned (replaced by a placeholder) after
+# AI_CALL_DEADLINE seconds. Late responses still land in the response cache.
+AI_CONCURRENT_MODE = os.getenv("AI_CONCURRENT_MODE", "1") == "1"
+AI_CALL_DEADLINE = float(os.getenv("AI_CALL_DEADLINE", "3"))
+AI_MAX_WORKERS = int(os.getenv("AI_MAX_WORKERS", "8"))
+
+# OpenAI client and circuit breaker. When at least AI_BREAKER_FAILURE_RATE
+# of the last AI_BREAKER_WINDOW calls fail, calls are answered locally for
+# AI_BREAKER_COOLDOWN seconds before a single probe call is tried again.
+AI_MODEL = os.getenv("AI_MODEL", "gpt-4")
+AI_API_BASE = os.getenv("AI_API_BASE")               # e.g. a local stub server
+AI_REQUEST_TIMEOUT = float(os.getenv("AI_REQUEST_TIMEOUT", "10"))
+AI_BREAKER_FAILURE_RATE = float(os.getenv("AI_BREAKER_FAILURE_RATE", "0.5"))
+AI_BREAKER_WINDOW = int(os.getenv("AI_BREAKER_WINDOW", "20"))
+AI_BREAKER_MIN_CALLS = int(os.getenv("AI_BREAKER_MIN_CALLS", "5"))
+AI_BREAKER_COOLDOWN = float(os.getenv("AI_BREAKER_COOLDOWN", "30"))
+
+# Event Catalog Configuration
+# ---------------------------
+# LIST commands are served from a local catalog of events. It is refreshed
+# in the background from EVENT_CATALOG_FILE (JSON array or CSV) when set,
+# otherwise from the LLM when EVENT_CATALOG_AI_REFRESH is enabled.
+EVENT_CATALOG_FILE = os.getenv("EVENT_CATALOG_FILE")
+EVENT_CATALOG_AI_REFRESH = os.getenv("EVENT_CATALOG_AI_REFRESH", "0") == "1"
+EVENT_CATALOG_REFRESH_SECONDS = float(os.getenv("EVENT_CATALOG_REFRESH_SECONDS", "900"))
+
+# Parser Configuration
+# --------------------
+# 'keywords' matches words with one rule and resolves keywords through a
+# table; 'legacy' uses the original one-regex-per-keyword lexer.
+LEXER_MODE = os.getenv("LEXER_MODE", "keywords")
+
+# Parsed commands are cached by normalized text (lowercase, single spaces);
+# repeated commands and /show_ast re-parses skip the parser entirely.
+PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "1024"))
+
+# Load the prebuilt lextab.py/parsetab.py without validating the grammar or
+# writing any files. Set PARSER_OPTIMIZE=0 while editing the grammar so PLY
+# regenerates the tables; ship them with "python build_tables.py".
+PARSER_OPTIMIZE = os.getenv("PARSER_OPTIMIZE", "1") == "1"
+
+# AST Rendering Configuration
+# ---------------------------
+# Rendered AST images are cached in memory by parse tree; the cache holds at
+# most AST_CACHE_MAX_ENTRIES images and AST_CACHE_MAX_BYTES bytes in total.
+AST_CACHE_MAX_ENTRIES = int(os.getenv("AST_CACHE_MAX_ENTRIES", "256"))
+AST_CACHE_MAX_BYTES = int(os.getenv("AST_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# Default /show_ast format: "png" needs the Graphviz dot binary; "svg" and
+# "dot" are produced in pure Python. Requests can pick one with ?format=.
+AST_DEFAULT_FORMAT = os.getenv("AST_DEFAULT_FORMAT", "png")
+
+# Graphviz renders run on a background pool of AST_RENDER_WORKERS threads.
+# Requests wait up to AST_RENDER_WAIT seconds and are then told the render
+# is pending; beyond AST_RENDER_QUEUE_LIMIT queued renders they are told the
+# renderer is busy. A dot process is killed after AST_RENDER_TIMEOUT seconds.
+# Finished renders (including failures) are kept for AST_RENDER_RETAIN seconds
+# so clients polling for the result get it instead of starting a new render.
+AST_RENDER_WORKERS = int(os.getenv("AST_RENDER_WORKERS", "2"))
+AST_RENDER_QUEUE_LIMIT = int(os.getenv("AST_RENDER_QUEUE_LIMIT", "32"))
+AST_RENDER_WAIT = float(os.getenv("AST_RENDER_WAIT", "2"))
+AST_RENDER_TIMEOUT = float(os.getenv("AST_RENDER_TIMEOUT", "10"))
+AST_RENDER_RETAIN = float(os.getenv("AST_RENDER_RETAIN", "30"))
+
 # Logging Configuration
 # --------------------
 # Sets up basic logging for the application with:
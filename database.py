@@ -1,50 +1,336 @@
 import sqlite3
 import datetime
+import ast
+import atexit
+import queue
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from config import DB_PATH, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_CACHE_SIZE_KB, TICKET_COUNTER_MAX_AGE
+from ticket_counter import TicketCounterIndex
+import inventory
 
+class ConnectionPool:
+    """
+    Bounded pool of long-lived SQLite connections shared by all threads
+
+    Connections are opened lazily up to ``size`` and handed out one thread at
+    a time, so Flask worker threads and the GUI can share them safely without
+    paying the connect/close cost on every command.
+
+    Notes:
+        - Connections are opened with check_same_thread=False because they
+          move between threads; the pool guarantees exclusive use
+        - Connections run in autocommit mode (isolation_level=None); use
+          transaction() for multi-statement atomic work
+        - WAL journal mode lets readers proceed while a writer commits
+    """
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _open(self):
+        """Opens a new connection with the tuned pragmas applied"""
+        conn = sqlite3.connect(self.path, timeout=DB_POOL_TIMEOUT,
+                               check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')  # Safe with WAL, avoids fsync per commit
+        conn.execute(f'PRAGMA cache_size=-{DB_CACHE_SIZE_KB}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute(f'PRAGMA busy_timeout={DB_POOL_TIMEOUT * 1000}')
+        return conn
+
+    def acquire(self):
+        """
+        Takes a connection from the pool, opening one if under the size limit
+
+        Raises:
+            RuntimeError: If the pool was closed or no connection became free
+                          within DB_POOL_TIMEOUT seconds
+        """
+        if self._closed:
+            raise RuntimeError("Database connection pool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._open()
+                self._all.append(conn)
+                return conn
+        try:
+            return self._idle.get(timeout=DB_POOL_TIMEOUT)
+        except queue.Empty:
+            raise RuntimeError("Timed out waiting for a database connection")
+
+    def release(self, conn):
+        """
+        Returns a connection to the pool, rolling back any open transaction
+
+        Notes:
+            - Connections released after close() are closed instead of
+              being put back
+        """
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if not self._closed:
+                self._idle.put(conn)
+                return
+            if conn in self._all:
+                self._all.remove(conn)
+        _close_quietly(conn)
+
+    def close(self):
+        """
+        Closes the pool and every idle connection
+
+        Notes:
+            - Connections still checked out stay usable until their
+              borrower releases them, which then closes them
+        """
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._all.remove(conn)
+                _close_quietly(conn)
+
+def _close_quietly(conn):
+    """Closes a connection, ignoring errors (it may already be closed)"""
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    """Creates the process-wide pool on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH, DB_POOL_SIZE)
+    return _pool
+
+@contextmanager
 def connect_db():
     """
-    Establishes connection to SQLite database file
-    
-    Returns:
-        sqlite3.Connection: Database connection object
-    
+    Borrows a pooled connection to the SQLite database file
+
+    Yields:
+        sqlite3.Connection: Database connection object (autocommit mode)
+
     Notes:
-        - Uses SQLite's built-in connection pooling
         - Creates bookings.db file if it doesn't exist
-        - Default isolation level is DEFERRED
+        - The connection goes back to the pool when the block exits;
+          callers must not close it
+        - Single statements commit immediately; wrap related statements
+          in transaction() to make them atomic
+
+    Example:
+        >>> with connect_db() as conn:
+        ...     conn.execute('SELECT COUNT(*) FROM bookings').fetchone()
+    """
+    pool = _get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+@contextmanager
+def transaction(immediate=False):
+    """
+    Runs a block inside a single transaction on a pooled connection
+
+    Args:
+        immediate (bool): Take the write lock up front (BEGIN IMMEDIATE) so
+                          a read-then-write sequence cannot race other writers
+
+    Notes:
+        - Commits when the block exits normally, rolls back on exception
+    """
+    with connect_db() as conn:
+        conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+def close_db():
+    """
+    Closes all pooled connections
+
+    Notes:
+        - Registered with atexit; safe to call more than once
+        - A later connect_db() call opens a fresh pool
     """
-    return sqlite3.connect('bookings.db')
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+atexit.register(close_db)
+
+# Current schema version, tracked in PRAGMA user_version
+SCHEMA_VERSION = 2
+
+# Status each status-changing command moves a booking to
+ACTION_STATUSES = {'CONFIRM': 'Confirmed', 'PAY': 'Paid', 'CANCEL': 'Cancelled'}
+
+# Statuses written by older versions (the bare action name), see _migrate_schema()
+_LEGACY_STATUSES = {'Confirm': 'Confirmed', 'Pay': 'Paid', 'Cancel': 'Cancelled'}
+
+# Structured columns populated from the parsed details dict.
+# Maps column name -> key in the parser's details dict.
+BOOKING_FIELDS = {
+    'person': 'person',
+    'event_name': 'name',
+    'origin': 'from',
+    'destination': 'to',
+    'travel_date': 'date',
+    'travel_time': 'time',
+}
+
+# Columns returned by listing queries, in row order
+BOOKING_COLUMNS = ('id', 'resource', 'action', 'details', 'status', 'timestamp') + tuple(BOOKING_FIELDS)
 
 def initialize_db():
     """
-    Creates the database schema if it doesn't exist
+    Creates the database schema if it doesn't exist and migrates old files
     
     Schema Details:
         - id: Auto-incrementing primary key
         - resource: Type of booking (concert/football/train/airline)
         - action: Booking action (BOOK/CONFIRM/PAY/CANCEL)
-        - details: JSON-like string of booking particulars
+        - details: Original details dict as text (kept for display)
         - status: Current status (Reserved/Confirmed/Paid/Cancelled)
         - timestamp: ISO format datetime of record creation/modification
+        - person, event_name, origin, destination, travel_date, travel_time:
+          structured booking particulars used for lookups
+    
+    Indexes:
+        - (resource, person, status): active ticket counts per person
+        - (resource, person, id): most recent booking per person
     
     Notes:
         - Uses IF NOT EXISTS to prevent errors on multiple calls
-        - Commits changes immediately after execution
-        - Always closes connection to prevent leaks
-    """
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS bookings (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        resource TEXT,
-        action TEXT,
-        details TEXT,
-        status TEXT,
-        timestamp TEXT
-    )''')
-    conn.commit()
-    conn.close()
+        - Also switches the database file to WAL journal mode
+        - Older files are upgraded in place by _migrate_schema()
+        - Builds the in-memory ticket counter index from the table
+        - Creates the seat inventory table (see inventory.py)
+    """
+    with transaction(immediate=True) as conn:
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            resource TEXT,
+            action TEXT,
+            details TEXT,
+            status TEXT,
+            timestamp TEXT,
+            person TEXT,
+            event_name TEXT,
+            origin TEXT,
+            destination TEXT,
+            travel_date TEXT,
+            travel_time TEXT
+        )''')
+        inventory.create_inventory_table(conn)
+        _migrate_schema(conn)
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_bookings_person_status
+            ON bookings(resource, person, status)''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_bookings_person_id
+            ON bookings(resource, person, id)''')
+    rebuild_ticket_counts()
+
+def _migrate_schema(conn):
+    """
+    One-shot upgrades of databases created by older versions
+    
+    Process Flow:
+        1. Version 1: adds any missing structured columns with ALTER TABLE,
+           parses each legacy details string back into a dict and copies
+           the parsed values into the new columns
+        2. Version 2: renames bare action statuses ('Cancel', 'Pay',
+           'Confirm') to ACTION_STATUSES and returns the seats of bookings
+           that were cancelled under the old name
+        3. Stamps PRAGMA user_version so each step never runs twice
+    
+    Notes:
+        - Must run inside the caller's transaction
+        - Rows whose details cannot be parsed keep NULL columns
+    """
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    if version < 1:
+        _add_structured_columns(conn)
+    if version < 2:
+        _rename_legacy_statuses(conn)
+    conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+def _add_structured_columns(conn):
+    """Schema version 1: structured columns backfilled from the details text"""
+    existing = {row[1] for row in conn.execute('PRAGMA table_info(bookings)')}
+    for column in BOOKING_FIELDS:
+        if column not in existing:
+            conn.execute(f'ALTER TABLE bookings ADD COLUMN {column} TEXT')
+
+    rows = conn.execute('SELECT id, details FROM bookings WHERE person IS NULL').fetchall()
+    updates = []
+    for booking_id, details in rows:
+        parsed = _parse_legacy_details(details)
+        if parsed:
+            updates.append(_booking_fields(parsed) + (booking_id,))
+    if updates:
+        assignments = ', '.join(f'{column} = ?' for column in BOOKING_FIELDS)
+        conn.executemany(f'UPDATE bookings SET {assignments} WHERE id = ?', updates)
+
+def _rename_legacy_statuses(conn):
+    """Schema version 2: bare action statuses renamed to ACTION_STATUSES"""
+    columns = 'resource, event_name, origin, destination, travel_date, travel_time'
+    for resource, *fields in conn.execute(
+            f"SELECT {columns} FROM bookings WHERE status = 'Cancel'").fetchall():
+        inventory.release(conn, resource, inventory.inventory_key(resource, _details_from_row(*fields)))
+    conn.executemany('UPDATE bookings SET status = ? WHERE status = ?',
+                     [(new, old) for old, new in _LEGACY_STATUSES.items()])
+
+def _parse_legacy_details(details):
+    """Turns a str(dict) details blob back into a dict, or None if unparseable"""
+    try:
+        parsed = ast.literal_eval(details or '')
+    except (ValueError, SyntaxError):
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+def _details_from_row(event_name, origin, destination, travel_date, travel_time):
+    """Rebuilds the parser-style details keys from structured booking columns"""
+    values = (None, event_name, origin, destination, travel_date, travel_time)
+    return {key: value for key, value in zip(BOOKING_FIELDS.values(), values) if value is not None}
+
+def _booking_fields(details):
+    """Extracts the structured column values (in BOOKING_FIELDS order) from a details dict"""
+    if not isinstance(details, dict):
+        return (None,) * len(BOOKING_FIELDS)
+    return tuple(details.get(key) for key in BOOKING_FIELDS.values())
 
 def add_booking(resource, details, action, status):
     """
@@ -52,64 +338,332 @@ def add_booking(resource, details, action, status):
     
     Args:
         resource (str): Type of resource being booked
-        details (dict/str): Booking particulars (converted to string)
+        details (dict/str): Booking particulars
         action (str): Action performed (BOOK/CONFIRM/etc)
         status (str): Initial status of booking
     
     Process Flow:
         1. Creates timestamp in ISO format
-        2. Converts details to string representation
+        2. Splits details into the structured columns
         3. Uses parameterized query to prevent SQL injection
-        4. Commits transaction immediately
+        4. Commits immediately (autocommit connection)
     
     Security:
         - Uses parameterized queries exclusively
-        - Automatic connection cleanup
+        - Connection is returned to the pool automatically
     """
-    conn = connect_db()
-    cursor = conn.cursor()
+    with connect_db() as conn:
+        _insert_booking(conn, resource, details, action, status)
+    person = details.get('person') if isinstance(details, dict) else None
+    if person and status != 'Cancelled':
+        ticket_counts.adjust(person, resource, 1)
+
+# Statements shared by the single-command and batch write paths
+_INSERT_BOOKING_SQL = '''
+    INSERT INTO bookings 
+    (resource, action, details, status, timestamp,
+     person, event_name, origin, destination, travel_date, travel_time) 
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+_ACTIVE_COUNT_SQL = '''
+    SELECT COUNT(*) FROM bookings 
+    WHERE resource = ? AND person = ? AND status != 'Cancelled'
+'''
+
+def _booking_row(resource, details, action, status, timestamp):
+    """Parameters for _INSERT_BOOKING_SQL"""
+    return (resource, action, str(details), status, timestamp) + _booking_fields(details)
+
+def _insert_booking(conn, resource, details, action, status):
+    """Inserts one booking row on the given connection and returns its id"""
     timestamp = datetime.datetime.now().isoformat()
-    cursor.execute('''
-        INSERT INTO bookings 
-        (resource, action, details, status, timestamp) 
-        VALUES (?, ?, ?, ?, ?)''',
-        (resource, action, str(details), status, timestamp))
-    conn.commit()
-    conn.close()
+    cursor = conn.execute(_INSERT_BOOKING_SQL, _booking_row(resource, details, action, status, timestamp))
+    return cursor.lastrowid
+
+# Outcome of reserve_booking(): whether the booking was made, the person's
+# active ticket count afterwards, the new row id (None when refused) and
+# whether it was refused because the event/departure is sold out
+Reservation = namedtuple('Reservation', ['reserved', 'count', 'booking_id', 'sold_out'],
+                         defaults=[False])
 
-def update_booking_status(resource, person, new_status):
+def reserve_booking(resource, details, limit, quantity=1, status="Reserved"):
     """
-    Updates the most recent booking matching criteria
+    Atomically checks the per-person ticket limit and seat inventory,
+    then inserts the booking
+    
+    Args:
+        resource (str): Type of resource being booked
+        details (dict): Parsed booking particulars (must contain 'person')
+        limit (int): Maximum active tickets allowed for this resource
+        quantity (int): Number of tickets requested
+        status (str): Initial status of the booking
+    
+    Returns:
+        Reservation: (reserved, count, booking_id, sold_out)
+    
+    Notes:
+        - BEGIN IMMEDIATE takes the write lock before counting, so two
+          concurrent requests for the same person cannot both pass the check
+        - Seats are taken with one conditional UPDATE on the inventory row
+        - Count, seat and insert share one connection and one round trip
+        - ticket_counts is adjusted by the tickets added, never set to the
+          count read here: a concurrent cancel applied meanwhile would be
+          overwritten by a stale absolute value
+    """
+    person = details.get('person')
+    reservation = Reservation(False, 0, None)
+    with transaction(immediate=True) as conn:
+        count = conn.execute(_ACTIVE_COUNT_SQL, (resource, person)).fetchone()[0]
+        reservation = Reservation(False, count, None)
+        if count + quantity <= limit:
+            if not inventory.take(conn, resource, inventory.inventory_key(resource, details), quantity):
+                reservation = Reservation(False, count, None, sold_out=True)
+            else:
+                booking_id = None
+                for _ in range(quantity):
+                    booking_id = _insert_booking(conn, resource, details, "BOOK", status)
+                reservation = Reservation(True, count + quantity, booking_id)
+    if reservation.reserved:
+        ticket_counts.adjust(person, resource, quantity)
+    return reservation
+
+# Outcome of update_booking_status(): whether the status changed, the
+# person's active ticket count afterwards, the booking that matched (None
+# when there is none), whether reinstating it failed because it sold out and
+# whether it was left alone because it is cancelled (already cancelled, or
+# picked without an id for CONFIRM/PAY)
+StatusUpdate = namedtuple('StatusUpdate', ['updated', 'count', 'booking_id', 'sold_out', 'cancelled'],
+                          defaults=[False, False])
+
+def update_booking_status(resource, person, new_status, booking_id=None):
+    """
+    Updates one booking's status, by id or the person's most recent booking
     
     Args:
         resource (str): Type of resource to update
-        person (str): Name to match in details
+        person (str): Exact name of the person on the booking
         new_status (str): New status to set
+        booking_id (int, optional): Primary key of the booking to update;
+                                    must also match resource and person
+    
+    Returns:
+        StatusUpdate: (updated, count, booking_id, sold_out, cancelled)
     
     Query Logic:
-        - Uses subquery to find most recent matching booking
-        - LIKE operator for name matching in details text
+        - With booking_id: primary-key lookup
+        - Without: most recent booking for the person that is not
+          cancelled, falling back to the most recent one; served by the
+          (resource, person, id) index, no table scan
         - Updates both status and modification timestamp
-        - Limits to one record with DESC/LIMIT 1
     
     Notes:
-        - % wildcards in LIKE pattern match any text around the name
         - ISO timestamp provides sortable chronological record
+        - Reads the previous status in the same transaction so the
+          ticket counter sees transitions into and out of 'Cancelled'
+        - Cancelling returns the seat to inventory; reactivating a
+          cancelled booking takes one again and is skipped if sold out
+        - Cancelling a cancelled booking is a no-op, and a cancelled
+          booking is only reactivated when named by booking_id
+    """
+    with transaction(immediate=True) as conn:
+        updated, old_status, matched_id, sold_out = _update_status(conn, resource, person,
+                                                                   new_status, booking_id)
+    if updated:
+        ticket_counts.apply_status_change(person, resource, old_status, new_status)
+    return StatusUpdate(bool(updated), get_active_ticket_count(person, resource), matched_id,
+                        sold_out, cancelled=not updated and old_status == 'Cancelled' and not sold_out)
+
+def _update_status(conn, resource, person, new_status, booking_id=None):
+    """
+    Status change on an open transaction (see update_booking_status)
+
+    Returns:
+        tuple: (rows updated, previous status or None, matched booking id
+                or None, True if reinstating failed because it sold out)
+    
+    Notes:
+        - Nothing is updated when the booking is already cancelled and
+          new_status is 'Cancelled', or when it is cancelled, new_status
+          is not and it was picked without booking_id
     """
-    conn = connect_db()
-    cursor = conn.cursor()
     timestamp = datetime.datetime.now().isoformat()
-    cursor.execute('''
+    columns = 'id, status, event_name, origin, destination, travel_date, travel_time'
+    if booking_id is not None:
+        row = conn.execute(f'''
+            SELECT {columns} FROM bookings 
+            WHERE id = ? AND resource = ? AND person = ?''',
+            (booking_id, resource, person)).fetchone()
+    else:
+        row = conn.execute(f'''
+            SELECT {columns} FROM bookings 
+            WHERE resource = ? AND person = ? 
+            ORDER BY status = 'Cancelled', id DESC LIMIT 1''',
+            (resource, person)).fetchone()
+    if row is None:
+        return 0, None, None, False
+    picked = booking_id is None
+    booking_id, old_status = row[:2]
+    if old_status == 'Cancelled' and (new_status == 'Cancelled' or picked):
+        return 0, old_status, booking_id, False
+    key = inventory.inventory_key(resource, _details_from_row(*row[2:]))
+    if old_status != 'Cancelled' and new_status == 'Cancelled':
+        inventory.release(conn, resource, key)
+    elif old_status == 'Cancelled' and new_status != 'Cancelled':
+        if not inventory.take(conn, resource, key):
+            return 0, old_status, booking_id, True
+    updated = conn.execute('''
         UPDATE bookings 
         SET status = ?, timestamp = ? 
-        WHERE id = (
-            SELECT id FROM bookings 
-            WHERE resource = ? AND details LIKE ? 
-            ORDER BY id DESC LIMIT 1
-        )''', 
-        (new_status, timestamp, resource, f'%{person}%'))
-    conn.commit()
-    conn.close()
+        WHERE id = ?''', 
+        (new_status, timestamp, booking_id)).rowcount
+    return updated, old_status, booking_id, False
+
+# Outcome of one operation in apply_booking_batch(): success flag, booking
+# id (the new booking for BOOK, the matched one for status changes), the
+# person's active count afterwards and, on failure, the reason: 'limit',
+# 'sold_out' (no seat to book or to reinstate a cancelled booking),
+# 'cancelled' (the booking is cancelled and was left alone, see
+# update_booking_status) or 'not_found'
+BatchOutcome = namedtuple('BatchOutcome', ['ok', 'booking_id', 'count', 'reason'])
+
+def apply_booking_batch(operations, limits):
+    """
+    Applies many BOOK/CONFIRM/PAY/CANCEL operations in one transaction
+    
+    Args:
+        operations (list): (action, details) pairs as produced by the
+                           parser, e.g. ('BOOK', {...}) or ('PAY', {...})
+        limits (dict): Per-resource ticket limits (config.TICKET_LIMITS)
+    
+    Returns:
+        list: One BatchOutcome per operation, in order
+    
+    Notes:
+        - Operations are applied in order, so a CANCEL after a BOOK in
+          the same batch sees that booking
+        - New bookings are queued and written with executemany, flushed
+          before any status change that might need to see them
+        - Limits and seat inventory are enforced exactly as in
+          reserve_booking(); the write lock is held for the whole batch
+        - ticket_counts is adjusted by each person's net change, like
+          reserve_booking()
+    """
+    outcomes = [None] * len(operations)
+    counts = {}     # (person, resource) -> active count inside this transaction
+    initial = {}    # (person, resource) -> active count before the batch
+    pending = []    # (operation index, insert row)
+
+    def active_count(conn, person, resource):
+        key = (person, resource)
+        if key not in counts:
+            counts[key] = initial[key] = conn.execute(_ACTIVE_COUNT_SQL, (resource, person)).fetchone()[0]
+        return counts[key]
+
+    def flush(conn):
+        if not pending:
+            return
+        conn.executemany(_INSERT_BOOKING_SQL, [row for _, row in pending])
+        # Rows from one executemany get consecutive AUTOINCREMENT ids
+        last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+        first_id = last_id - len(pending) + 1
+        for offset, (index, _) in enumerate(pending):
+            outcomes[index] = outcomes[index]._replace(booking_id=first_id + offset)
+        pending.clear()
+
+    timestamp = datetime.datetime.now().isoformat()
+    with transaction(immediate=True) as conn:
+        for index, (action, details) in enumerate(operations):
+            resource, person = details.get('type'), details.get('person')
+            count = active_count(conn, person, resource)
+            if action == 'BOOK':
+                if count + 1 > limits.get(resource, 0):
+                    outcomes[index] = BatchOutcome(False, None, count, 'limit')
+                elif not inventory.take(conn, resource, inventory.inventory_key(resource, details)):
+                    outcomes[index] = BatchOutcome(False, None, count, 'sold_out')
+                else:
+                    counts[(person, resource)] = count + 1
+                    outcomes[index] = BatchOutcome(True, None, count + 1, None)
+                    pending.append((index, _booking_row(resource, details, "BOOK", "Reserved", timestamp)))
+            else:
+                flush(conn)
+                new_status = ACTION_STATUSES[action]
+                updated, old_status, booking_id, sold_out = _update_status(
+                    conn, resource, person, new_status, details.get('booking_id'))
+                if updated:
+                    if old_status != 'Cancelled' and new_status == 'Cancelled':
+                        counts[(person, resource)] = count - 1
+                    elif old_status == 'Cancelled' and new_status != 'Cancelled':
+                        counts[(person, resource)] = count + 1
+                    reason = None
+                elif sold_out:
+                    reason = 'sold_out'
+                else:
+                    reason = 'cancelled' if old_status == 'Cancelled' else 'not_found'
+                outcomes[index] = BatchOutcome(bool(updated), booking_id if reason != 'not_found' else None,
+                                               counts[(person, resource)], reason)
+        flush(conn)
+
+    for (person, resource), count in counts.items():
+        if count != initial[(person, resource)]:
+            ticket_counts.adjust(person, resource, count - initial[(person, resource)])
+    return outcomes
+
+def set_inventory_capacity(resource, key, capacity):
+    """Sets the capacity of an event or departure (see inventory.inventory_key)"""
+    with transaction(immediate=True) as conn:
+        inventory.set_capacity(conn, resource, key, capacity)
+
+def get_remaining_capacity(resource, details):
+    """Returns places left for the event/departure in details, or None if unlimited"""
+    key = inventory.inventory_key(resource, details)
+    if key is None:
+        return None
+    with connect_db() as conn:
+        return inventory.remaining(conn, resource, key)
+
+# --------------------------
+# Ticket Counter Index
+# --------------------------
+
+# Process-wide active ticket counts, keyed by (person, resource)
+ticket_counts = TicketCounterIndex(max_age=TICKET_COUNTER_MAX_AGE)
+
+def rebuild_ticket_counts():
+    """Reloads the ticket counter index from the bookings table"""
+    with connect_db() as conn:
+        ticket_counts.rebuild(conn)
+
+def verify_ticket_counts(repair=False):
+    """
+    Checks the in-memory ticket counts against the database
+    
+    Args:
+        repair (bool): Rebuild the index if any count disagrees
+    
+    Returns:
+        dict: {(person, resource): (cached_count, actual_count)} mismatches
+    
+    Notes:
+        - Mismatches are expected when other processes write to the same
+          database file; schedule this (or set TICKET_COUNTER_MAX_AGE)
+          in multi-process deployments
+    """
+    with connect_db() as conn:
+        mismatches = ticket_counts.verify(conn)
+        if mismatches and repair:
+            ticket_counts.rebuild(conn)
+    return mismatches
+
+def get_active_ticket_count(person, resource):
+    """
+    Returns the person's active ticket count from the in-memory index
+    
+    Notes:
+        - No database I/O unless the index was never built or has
+          outlived TICKET_COUNTER_MAX_AGE
+    """
+    if ticket_counts.needs_rebuild():
+        rebuild_ticket_counts()
+    return ticket_counts.get(person, resource)
 
 def list_bookings():
     """
@@ -126,15 +680,92 @@ def list_bookings():
         - details (str)
         - status (str)
         - timestamp (str)
+        - person, event_name, origin, destination,
+          travel_date, travel_time (str or None)
     
     Notes:
+        - Column order is fixed by BOOKING_COLUMNS
         - Returns raw result set for flexibility
         - Caller must handle result processing
         - Empty list returned if no bookings exist
+        - Loads the whole table; prefer iter_bookings() or
+          list_bookings_page() for large tables
+    """
+    with connect_db() as conn:
+        return conn.execute(f'SELECT {", ".join(BOOKING_COLUMNS)} FROM bookings').fetchall()
+
+def _booking_filters(resource=None, person=None, status=None):
+    """Builds the WHERE conditions and parameters for listing filters"""
+    conditions, params = [], []
+    for column, value in (('resource', resource), ('person', person), ('status', status)):
+        if value is not None:
+            conditions.append(f'{column} = ?')
+            params.append(value)
+    return conditions, params
+
+def list_bookings_page(after_id=0, limit=50, resource=None, person=None, status=None):
+    """
+    Retrieves one page of bookings using keyset pagination
+    
+    Args:
+        after_id (int): Return bookings with id greater than this (the
+                        cursor returned by the previous page; 0 for the first)
+        limit (int): Maximum rows in the page
+        resource, person, status (str, optional): Exact-match filters
+    
+    Returns:
+        tuple: (rows, next_after_id) where next_after_id is None on the
+               last page
+    
+    Notes:
+        - Seeks by primary key instead of OFFSET, so every page costs the
+          same regardless of how deep into the table it is
+        - Rows have the BOOKING_COLUMNS layout
+    """
+    conditions, params = _booking_filters(resource, person, status)
+    conditions.insert(0, 'id > ?')
+    params.insert(0, after_id)
+    with connect_db() as conn:
+        rows = conn.execute(f'''
+            SELECT {", ".join(BOOKING_COLUMNS)} FROM bookings
+            WHERE {" AND ".join(conditions)}
+            ORDER BY id LIMIT ?''', params + [limit + 1]).fetchall()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1][0]
+    return rows, None
+
+def iter_bookings(resource=None, person=None, status=None, batch_size=500):
+    """
+    Yields bookings one at a time, fetching batch_size rows per query
+    
+    Notes:
+        - Memory use is bounded by batch_size, not by table size
+        - The pooled connection is only held while a batch is fetched,
+          so slow consumers (e.g. streamed HTTP responses) don't pin it
+    """
+    after_id = 0
+    while after_id is not None:
+        rows, after_id = list_bookings_page(after_id, batch_size, resource, person, status)
+        yield from rows
+
+def get_booking(booking_id):
+    """
+    Retrieves one booking by id
+    
+    Returns:
+        tuple or None: Row in BOOKING_COLUMNS layout, None if no such booking
+    """
+    with connect_db() as conn:
+        return conn.execute(f'SELECT {", ".join(BOOKING_COLUMNS)} FROM bookings WHERE id = ?',
+                            (booking_id,)).fetchone()
+
+def booking_as_dict(row):
+    """
+    Converts a booking row to a JSON-friendly dict
+    
+    Notes:
+        - Keys are BOOKING_COLUMNS; empty structured columns are dropped
+          to keep API responses compact
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM bookings')
-    bookings = cursor.fetchall()
-    conn.close()
-    return bookings
\ No newline at end of file
+    return {column: value for column, value in zip(BOOKING_COLUMNS, row) if value is not None}
@@ -0,0 +1,316 @@
+import csv
+import datetime
+import json
+import logging
+import threading
+from collections import namedtuple
+from database import connect_db, transaction
+import inventory
+from config import EVENT_CATALOG_FILE, EVENT_CATALOG_REFRESH_SECONDS, EVENT_CATALOG_AI_REFRESH
+
+# One catalog entry; also the row shape of the events table
+Event = namedtuple('Event', [
+    'event_type', 'name', 'event_date', 'event_time', 'venue',
+    'capacity', 'tickets_remaining', 'price',
+])
+
+EVENT_TYPES = ('concert', 'football', 'train', 'airline')
+
+# SQL for an events row's inventory.inventory_key (see inventory.inventory_key)
+_INVENTORY_KEY_SQL = "lower(e.name) || '@' || e.event_date"
+
+class EventCatalog:
+    """
+    Local catalog of upcoming events served from an in-memory index
+
+    The events table is the source of truth; the index keeps each event
+    type's events, so LIST is a dict lookup plus a primary-key read of the
+    live ticket counts.
+
+    Notes:
+        - Refreshed in the background from a file import or the LLM
+        - Readers never block on a refresh: the index is swapped atomically
+    """
+
+    def __init__(self):
+        self._events = {}     # event_type -> tuple of Event (date order)
+        self._by_name = {}    # (event_type, lowercase name) -> next upcoming Event
+        self._refresh_thread = None
+        self._stop = threading.Event()
+
+    # --------------------------
+    # Schema and loading
+    # --------------------------
+
+    def initialize(self):
+        """Creates the events table if needed and loads the index"""
+        with connect_db() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    event_type TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    event_date TEXT NOT NULL,
+                    event_time TEXT,
+                    venue TEXT,
+                    capacity INTEGER NOT NULL DEFAULT 0,
+                    tickets_remaining INTEGER NOT NULL DEFAULT 0,
+                    price REAL,
+                    updated_at TEXT,
+                    UNIQUE (event_type, name, event_date)
+                )''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_events_type_date ON events(event_type, event_date)')
+            _seed_dated_inventory(conn)
+        self.reload()
+
+    def reload(self):
+        """
+        Rebuilds the in-memory index from upcoming events in the table
+
+        Notes:
+            - Capacity and tickets remaining are refreshed from the live
+              inventory whenever events are served (see events())
+        """
+        today = datetime.date.today().isoformat()
+        columns = ', '.join(f'e.{field}' for field in Event._fields)
+        columns = columns.replace('e.capacity', 'COALESCE(i.capacity, e.capacity)')
+        columns = columns.replace('e.tickets_remaining', 'COALESCE(i.remaining, e.tickets_remaining)')
+        with connect_db() as conn:
+            rows = conn.execute(f'''
+                SELECT {columns} FROM events e
+                LEFT JOIN inventory i
+                    ON i.resource = e.event_type AND i.inventory_key = {_INVENTORY_KEY_SQL}
+                WHERE e.event_date >= ?
+                ORDER BY e.event_type, e.event_date, e.event_time''', (today,)).fetchall()
+
+        grouped = {}
+        for row in rows:
+            event = Event(*row)
+            grouped.setdefault(event.event_type, []).append(event)
+
+        events = {event_type: tuple(items) for event_type, items in grouped.items()}
+        by_name = {}
+        for items in events.values():
+            for event in items:
+                by_name.setdefault((event.event_type, event.name.lower()), event)
+        # Swap references in one step each; readers see old or new, never partial
+        self._events, self._by_name = events, by_name
+
+    # --------------------------
+    # Lookups
+    # --------------------------
+
+    def listing(self, event_type):
+        """Returns the formatted listing for an event type, or None if none are known"""
+        events = self.events(event_type)
+        return format_listing(events) if events else None
+
+    def events(self, event_type):
+        """
+        Returns the upcoming events of a type, in date order
+
+        Notes:
+            - Capacity and tickets remaining are read from the seat
+              inventory on every call, so they include bookings and
+              cancellations made since the last reload
+        """
+        events = self._events.get(event_type, ())
+        if not events:
+            return ()
+        keys = [inventory.inventory_key(event_type, {'name': event.name, 'date': event.event_date})
+                for event in events]
+        with connect_db() as conn:
+            live = {key: (capacity, remaining) for key, capacity, remaining in conn.execute(f'''
+                SELECT inventory_key, capacity, remaining FROM inventory
+                WHERE resource = ? AND inventory_key IN ({', '.join('?' * len(keys))})''',
+                [event_type] + keys)}
+        return tuple(
+            event._replace(capacity=live[key][0], tickets_remaining=live[key][1]) if key in live else event
+            for event, key in zip(events, keys))
+
+    def find(self, event_type, name):
+        """Looks up the next upcoming event by type and name (case-insensitive), or None"""
+        return self._by_name.get((event_type, str(name).lower()))
+
+    def with_event_date(self, details):
+        """
+        Adds the date of the next upcoming matching event to BOOK details
+
+        Returns:
+            dict: details with 'date' set when the event is in the catalog,
+                  otherwise details unchanged (bookings then draw on the
+                  undated inventory row for the name)
+        """
+        if details.get('date') or not details.get('name'):
+            return details
+        event = self.find(details.get('type'), details['name'])
+        return dict(details, date=event.event_date) if event else details
+
+    # --------------------------
+    # Updates
+    # --------------------------
+
+    def upsert(self, events):
+        """
+        Inserts or updates events and refreshes the index
+
+        Notes:
+            - Existing events (same type, name and date) keep their
+              tickets_remaining, so refreshes don't undo sales
+            - New events seed the seat inventory with their capacity
+        """
+        now = datetime.datetime.now().isoformat()
+        events = list(events)
+        rows = [tuple(event) + (now,) for event in events]
+        if not rows:
+            return 0
+        with transaction(immediate=True) as conn:
+            for event in events:
+                if event.capacity:
+                    inventory.seed(conn, event.event_type, inventory.inventory_key(
+                        event.event_type, {'name': event.name, 'date': event.event_date}),
+                        event.capacity, event.tickets_remaining)
+            conn.executemany('''
+                INSERT INTO events
+                (event_type, name, event_date, event_time, venue,
+                 capacity, tickets_remaining, price, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (event_type, name, event_date) DO UPDATE SET
+                    event_time = excluded.event_time,
+                    venue = excluded.venue,
+                    capacity = excluded.capacity,
+                    price = excluded.price,
+                    updated_at = excluded.updated_at''', rows)
+        self.reload()
+        return len(rows)
+
+    def import_file(self, path):
+        """
+        Imports events from a JSON array or a CSV file with Event columns
+
+        Returns:
+            int: Number of events imported
+        """
+        with open(path, newline='', encoding='utf-8') as handle:
+            if path.lower().endswith('.csv'):
+                records = list(csv.DictReader(handle))
+            else:
+                records = json.load(handle)
+        return self.upsert(filter(None, map(_event_from_record, records)))
+
+    def refresh_from_ai(self, event_type):
+        """
+        Asks the LLM for upcoming events of a type and stores them
+
+        Notes:
+            - Unparseable or unavailable responses leave the catalog unchanged
+        """
+        from openai_integration import get_chatgpt_response
+        prompt = f"""Generate 5 realistic upcoming {event_type} events in Jamaica as a JSON array.
+    Each item must have: "name", "event_date" (YYYY-MM-DD, in the future), "event_time" (HH:MM),
+    "venue", "capacity" (integer), "price" (number, JMD). Respond with JSON only."""
+        response = get_chatgpt_response(prompt)
+        try:
+            records = json.loads(response[response.index('['):response.rindex(']') + 1])
+        except (ValueError, TypeError):
+            logging.warning(f"Could not parse AI event listing for {event_type}")
+            return 0
+        for record in records:
+            if isinstance(record, dict):
+                record['event_type'] = event_type
+        return self.upsert(filter(None, map(_event_from_record, records)))
+
+    def refresh(self):
+        """Refreshes from the configured file, otherwise (if enabled) from the LLM"""
+        if EVENT_CATALOG_FILE:
+            self.import_file(EVENT_CATALOG_FILE)
+        elif EVENT_CATALOG_AI_REFRESH:
+            for event_type in EVENT_TYPES:
+                self.refresh_from_ai(event_type)
+        else:
+            self.reload()
+
+    # --------------------------
+    # Background refresh
+    # --------------------------
+
+    def start_background_refresh(self, interval=EVENT_CATALOG_REFRESH_SECONDS):
+        """Starts a daemon thread that calls refresh() every interval seconds"""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logging.error(f"Event catalog refresh failed: {str(e)}")
+                self._stop.wait(interval)
+
+        self._refresh_thread = threading.Thread(target=run, name="event-catalog-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def stop_background_refresh(self):
+        self._stop.set()
+
+def _seed_dated_inventory(conn):
+    """
+    Gives every capacity-limited event its own inventory row
+
+    Notes:
+        - Upgrades inventory keyed by event name only: each date starts
+          from the remaining count of the old shared row (sales can't be
+          split between dates after the fact)
+        - Rows that already exist are left alone
+    """
+    conn.execute(f'''
+        INSERT OR IGNORE INTO inventory (resource, inventory_key, capacity, remaining)
+        SELECT e.event_type, {_INVENTORY_KEY_SQL},
+               COALESCE(i.capacity, e.capacity), COALESCE(i.remaining, e.tickets_remaining)
+        FROM events e
+        LEFT JOIN inventory i
+            ON i.resource = e.event_type AND i.inventory_key = lower(e.name)
+        WHERE e.capacity > 0''')
+
+def _event_from_record(record):
+    """Builds an Event from an imported dict, or None if it is invalid"""
+    try:
+        event_type = str(record['event_type']).lower()
+        event_date = datetime.datetime.strptime(str(record['event_date']), "%Y-%m-%d").date().isoformat()
+        capacity = int(record.get('capacity') or 0)
+        remaining = record.get('tickets_remaining')
+        return Event(
+            event_type=event_type,
+            name=str(record['name']).strip(),
+            event_date=event_date,
+            event_time=record.get('event_time') or None,
+            venue=record.get('venue') or None,
+            capacity=capacity,
+            tickets_remaining=capacity if remaining in (None, '') else int(remaining),
+            price=float(record['price']) if record.get('price') not in (None, '') else None,
+        )
+    except (KeyError, ValueError, TypeError, AttributeError):
+        logging.warning(f"Skipping invalid event record: {record!r}")
+        return None
+
+def format_listing(events):
+    """Formats events like the LLM listing: one numbered line per event"""
+    lines = []
+    for number, event in enumerate(events, start=1):
+        when = f"{event.event_date} at {event.event_time}" if event.event_time else event.event_date
+        where = f" in {event.venue}" if event.venue else ""
+        price = f", JMD {event.price:,.0f}" if event.price is not None else ""
+        lines.append(f"{number}. {event.name} - {when}{where} "
+                     f"({event.tickets_remaining} of {event.capacity} tickets left{price})")
+    return "\n".join(lines)
+
+# Process-wide catalog instance
+catalog = EventCatalog()
+
+def initialize_catalog(start_refresh=True):
+    """Creates/loads the catalog and optionally starts the background refresh"""
+    catalog.initialize()
+    if start_refresh:
+        catalog.start_background_refresh()
+    return catalog
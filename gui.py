@@ -1,10 +1,84 @@
 import tkinter as tk
 from tkinter import scrolledtext
 import os
-from command_processing import process_command, generate_ast
-from lexer_parser import parser
+import queue
+import tempfile
+import threading
+import time
+from command_processing import run_command
+from renderers import render_text_chunks
+from ast_generator import request_ast_render, render_status
+from lexer_parser import parse_command
 from database import initialize_db
-from config import show_help
+from event_catalog import initialize_catalog
+from config import show_help, AST_RENDER_TIMEOUT
+
+# How often the Tk main loop collects worker output (milliseconds)
+OUTPUT_POLL_INTERVAL = 50
+
+# Slack past AST_RENDER_TIMEOUT before the GUI gives up on a running render,
+# so the worker's own "took longer than" error is normally shown instead
+AST_TIMEOUT_GRACE = 1.0
+
+class CommandWorker:
+    """
+    Runs GUI commands on a background thread so the window never freezes
+    
+    Commands are queued with submit() and run one at a time. Output is
+    posted to the `output` queue as (generation, kind, text) messages, kind
+    being 'text' or 'done'; the Tk side drains it with after().
+    
+    Notes:
+        - cancel() abandons the running command and everything queued
+          behind it: the command stops before writing to the database
+          (a write it already committed is kept) and its output is dropped
+        - Each generation has its own thread, so commands submitted after
+          cancel() never wait behind a stalled AI call
+        - AI calls run on the shared pool with AI_CALL_DEADLINE, so an
+          abandoned thread finishes within that deadline
+        - Tk widgets are only ever touched from the main thread
+    """
+    def __init__(self):
+        self.output = queue.Queue()
+        self._generation = 0
+        self._start()
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def _start(self):
+        """Starts the thread for the current generation, with its own queue and cancel event"""
+        self._jobs = queue.Queue()
+        self._cancel = threading.Event()
+        threading.Thread(target=self._run, args=(self._jobs, self._cancel, self._generation),
+                         name=f"gui-commands-{self._generation}", daemon=True).start()
+
+    def submit(self, command):
+        """Queues a command for the worker thread"""
+        self._jobs.put(command)
+
+    def cancel(self):
+        """Abandons the running command and everything queued behind it"""
+        self._cancel.set()
+        self._jobs.put(None)  # Wakes the thread if it is idle, so it can exit
+        self._generation += 1
+        self._start()
+
+    def _run(self, jobs, cancel, generation):
+        while True:
+            command = jobs.get()
+            if command is None or cancel.is_set():
+                return
+            try:
+                result = run_command(command, parse_command(command), concurrent=True, cancel=cancel)
+                for chunk in render_text_chunks(result):
+                    if cancel.is_set():
+                        break  # Cancelled while running
+                    self.output.put((generation, 'text', chunk))
+            except Exception as e:
+                self.output.put((generation, 'text', f"Error: {str(e)}\n"))
+            self.output.put((generation, 'done', command))
 
 def main():
     """
@@ -14,39 +88,107 @@ def main():
     try:
         # Initialize database connection and schema
         initialize_db()
+        initialize_catalog()
     except Exception as e:
         print(f"There has been a fatal error: {str(e)}")
         return
 
+    worker = CommandWorker()
+    pending = [0]  # Commands submitted but not finished (current generation)
+    # AST images shown this session; removed with the directory on exit
+    ast_dir = tempfile.TemporaryDirectory(prefix='ast_', ignore_cleanup_errors=True)
+    ast_views = [0]
+
     def run_function():
         """
         Handler for the Run button click event.
-        Processes the user's command input and displays results.
+        Queues the user's command on the worker; results arrive via drain_output().
         """
         input_entered = input_text_box.get("1.0", tk.END).strip()  
         if input_entered:
-            try:
-                # Parse and process the command
-                result = parser.parse(input_entered.lower())
-                process_command(input_entered, result, output_text_box)  
-            except Exception as e:
-                output_text_box.insert(tk.END, f"Error: {str(e)}\n")
+            worker.submit(input_entered)
+            pending[0] += 1
+            cancel_button.config(state=tk.NORMAL)
         else:
             output_text_box.insert(tk.END, "Error: You did not enter a command.\n")
 
+    def cancel_function():
+        """Handler for the Cancel button: abandons running and queued commands"""
+        if pending[0]:
+            worker.cancel()
+            pending[0] = 0
+            output_text_box.insert(tk.END, "Cancelled.\n")
+            output_text_box.see(tk.END)
+        cancel_button.config(state=tk.DISABLED)
+
+    def drain_output():
+        """
+        Moves worker output into the output box, one insert per poll
+        
+        Notes:
+            - Runs on the Tk main loop every OUTPUT_POLL_INTERVAL ms; all
+              text that arrived since the last poll is joined first
+        """
+        texts = []
+        while True:
+            try:
+                generation, kind, text = worker.output.get_nowait()
+            except queue.Empty:
+                break
+            if generation != worker.generation:
+                continue  # Output of a cancelled command
+            if kind == 'text':
+                texts.append(text)
+            else:
+                pending[0] = max(pending[0] - 1, 0)
+        if texts:
+            output_text_box.insert(tk.END, "".join(texts))
+            output_text_box.see(tk.END)
+        if not pending[0]:
+            cancel_button.config(state=tk.DISABLED)
+        gui_window.after(OUTPUT_POLL_INTERVAL, drain_output)
+
     def show_ast():
         input_entered = input_text_box.get("1.0", tk.END).strip()
         if input_entered:
-            try:
-                result = parser.parse(input_entered.lower())
-                ast_image = generate_ast(result)  # AST generated ONLY here
-                os.system(f"start {ast_image}")  # Windows
-                # For Mac/Linux: use `open` or `xdg-open`
-            except Exception as e:
-                output_text_box.insert(tk.END, f"Error generating AST: {str(e)}\n")
+            render = request_ast_render(parse_command(input_entered), wait=0)
+            poll_ast(render, None)
         else:
             output_text_box.insert(tk.END, "Error: No command to generate AST from\n")
 
+    def poll_ast(render, give_up_at):
+        """
+        Checks on a background AST render without blocking the Tk main loop,
+        rescheduling itself with after() until the image is ready
+        
+        Notes:
+            - Follows the render's future; it is never submitted twice
+            - give_up_at is set once the render starts running: time spent
+              queued behind other renders doesn't count against
+              AST_RENDER_TIMEOUT
+        """
+        if render.status == 'pending':
+            render = render_status(render.future)
+        if render.status == 'ready':
+            # Each view gets its own file so open viewers aren't overwritten
+            ast_views[0] += 1
+            path = os.path.join(ast_dir.name, f"ast_{ast_views[0]}.png")
+            with open(path, 'wb') as f:
+                f.write(render.data)
+            os.system(f"start {path}")  # Windows
+            # For Mac/Linux: use `open` or `xdg-open`
+        elif render.status == 'failed':
+            output_text_box.insert(tk.END, f"Error generating AST: {render.error}\n")
+        elif render.status == 'busy':
+            output_text_box.insert(tk.END, "Error generating AST: the renderer is busy, try again shortly\n")
+        else:
+            if give_up_at is None and render.future.running():
+                give_up_at = time.monotonic() + AST_RENDER_TIMEOUT + AST_TIMEOUT_GRACE
+            if give_up_at is not None and time.monotonic() > give_up_at:
+                output_text_box.insert(tk.END, "Error generating AST: timed out\n")
+            else:
+                gui_window.after(100, poll_ast, render, give_up_at)
+
     
     # Initialize main application window
     gui_window = tk.Tk()
@@ -145,9 +287,26 @@ def main():
         padx=20
     )
     ast_button.pack(side=tk.LEFT, padx=5)
+
+    cancel_button = tk.Button(
+        button_frame, 
+        text="Cancel", 
+        command=cancel_function, 
+        font=(7), 
+        bg="red", 
+        fg="white", 
+        relief="raised",
+        padx=20,
+        state=tk.DISABLED  # Enabled while commands are running
+    )
+    cancel_button.pack(side=tk.LEFT, padx=5)
     
     # Start the GUI event loop
-    gui_window.mainloop()
+    gui_window.after(OUTPUT_POLL_INTERVAL, drain_output)
+    try:
+        gui_window.mainloop()
+    finally:
+        ast_dir.cleanup()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
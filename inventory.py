@@ -0,0 +1,117 @@
+# Seat/ticket inventory: how many places each event or departure has left.
+#
+# Every function takes an open connection so it can join the caller's
+# transaction (reserve_booking, update_booking_status, batch imports).
+# Each reservation is a single conditional UPDATE on one inventory row, so
+# concurrent bookings for the same hot event need no application-level lock
+# and can never drive the count below zero.
+
+from config import INVENTORY_DEFAULT_CAPACITY
+
+def create_inventory_table(conn):
+    """Creates the inventory table if it doesn't exist"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS inventory (
+            resource TEXT NOT NULL,
+            inventory_key TEXT NOT NULL,
+            capacity INTEGER NOT NULL,
+            remaining INTEGER NOT NULL CHECK (remaining >= 0),
+            PRIMARY KEY (resource, inventory_key)
+        ) WITHOUT ROWID''')
+
+def inventory_key(resource, details):
+    """
+    Identifies what a booking consumes capacity from
+    
+    Args:
+        resource (str): concert/football/train/airline
+        details (dict): Parser details ('name' and, once resolved from the
+                        event catalog, 'date' for events; 'from', 'to',
+                        'date', 'time' for transport)
+    
+    Returns:
+        str: "name@date" for a dated event (just the name when the date is
+             unknown), or "origin>destination@date time" for a departure;
+             None if the details don't identify one
+    
+    Notes:
+        - Events are keyed like the events table (name and date), so each
+          date of a recurring event has its own capacity
+    """
+    if resource in ('train', 'airline'):
+        parts = [details.get(key) for key in ('from', 'to', 'date', 'time')]
+        if not all(parts):
+            return None
+        origin, destination, date, time = (str(part).lower() for part in parts)
+        return f"{origin}>{destination}@{date} {time}"
+    name = details.get('name')
+    if not name:
+        return None
+    date = details.get('date')
+    return f"{str(name).lower()}@{date}" if date else str(name).lower()
+
+def _ensure_row(conn, resource, key):
+    """Creates the row with the default capacity for the resource, if one is configured"""
+    capacity = INVENTORY_DEFAULT_CAPACITY.get(resource)
+    if capacity is not None:
+        conn.execute('''
+            INSERT OR IGNORE INTO inventory (resource, inventory_key, capacity, remaining)
+            VALUES (?, ?, ?, ?)''', (resource, key, capacity, capacity))
+
+def take(conn, resource, key, quantity=1):
+    """
+    Atomically reserves quantity places
+    
+    Returns:
+        bool: True if reserved (or the item has no capacity limit),
+              False if not enough places remain
+    """
+    if key is None:
+        return True
+    _ensure_row(conn, resource, key)
+    cursor = conn.execute('''
+        UPDATE inventory SET remaining = remaining - ?
+        WHERE resource = ? AND inventory_key = ? AND remaining >= ?''',
+        (quantity, resource, key, quantity))
+    if cursor.rowcount:
+        return True
+    # No row means nothing limits this item
+    return remaining(conn, resource, key) is None
+
+def release(conn, resource, key, quantity=1):
+    """Returns quantity places to the pool, never exceeding capacity"""
+    if key is None:
+        return
+    conn.execute('''
+        UPDATE inventory SET remaining = MIN(capacity, remaining + ?)
+        WHERE resource = ? AND inventory_key = ?''',
+        (quantity, resource, key))
+
+def remaining(conn, resource, key):
+    """Returns the places left, or None if the item is not capacity-limited"""
+    row = conn.execute('''
+        SELECT remaining FROM inventory
+        WHERE resource = ? AND inventory_key = ?''', (resource, key)).fetchone()
+    return row[0] if row else None
+
+def seed(conn, resource, key, capacity, remaining_count=None):
+    """Creates a row with a known capacity unless one already exists"""
+    conn.execute('''
+        INSERT OR IGNORE INTO inventory (resource, inventory_key, capacity, remaining)
+        VALUES (?, ?, ?, ?)''',
+        (resource, key, capacity, capacity if remaining_count is None else remaining_count))
+
+def set_capacity(conn, resource, key, capacity):
+    """
+    Sets an item's capacity, shifting remaining by the same amount
+
+    Notes:
+        - Remaining is clamped at zero when capacity drops below sales
+    """
+    conn.execute('''
+        INSERT INTO inventory (resource, inventory_key, capacity, remaining)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (resource, inventory_key) DO UPDATE SET
+            remaining = MAX(0, remaining + excluded.capacity - capacity),
+            capacity = excluded.capacity''',
+        (resource, key, capacity, capacity))
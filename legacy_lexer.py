@@ -0,0 +1,107 @@
+# Legacy lexer: one case-insensitive regex per keyword
+#
+# This is the original rule set, kept as the 'legacy' LEXER_MODE and as the
+# baseline for the lexer benchmark (benchmarks.py lexer). PLY tries the
+# rules in definition order, so keywords also match inside longer words
+# ("to" in "toronto", "in" in "kingston"); the default keyword-table lexer
+# in lexer_parser.py doesn't have that problem.
+import ply.lex as lex
+from lexer_parser import tokens, t_DATE, t_TIME, t_BOOKING_ID, t_STRING, t_ignore, t_error
+
+# Token matching rules (all case-insensitive)
+# Each function defines a regular expression pattern to match a token
+
+def t_LIST(t):
+    r'[Ll][Ii][Ss][Tt]'  # Matches "list" in any case combination
+    return t
+
+def t_BOOKINGS(t):
+    r'[Bb][Oo][Oo][Kk][Ii][Nn][Gg][Ss]'  # Matches "bookings"
+    return t
+
+def t_BOOK(t):
+    r'[Bb][Oo][Oo][Kk]'  # Matches "book"
+    return t
+
+def t_CONFIRM(t):
+    r'[Cc][Oo][Nn][Ff][Ii][Rr][Mm]'  # Matches "confirm"
+    return t
+
+def t_PAY(t):
+    r'[Pp][Aa][Yy]'  # Matches "pay"
+    return t
+
+def t_CANCEL(t):
+    r'[Cc][Aa][Nn][Cc][Ee][Ll]'  # Matches "cancel"
+    return t
+
+def t_VIEW(t):
+    r'[Vv][Ii][Ee][Ww]'  # Matches "view"
+    return t
+
+# Resource type tokens
+def t_CONCERT(t):
+    r'[Cc][Oo][Nn][Cc][Ee][Rr][Tt]'  # Matches "concert"
+    return t
+
+def t_FOOTBALL(t):
+    r'[Ff][Oo][Oo][Tt][Bb][Aa][Ll][Ll]'  # Matches "football"
+    return t
+
+def t_TRAIN(t):
+    r'[Tt][Rr][Aa][Ii][Nn]'  # Matches "train"
+    return t
+
+def t_AIRLINE(t):
+    r'[Aa][Ii][Rr][Ll][Ii][Nn][Ee]'  # Matches "airline"
+    return t
+
+def t_TICKETS(t):
+    r'[Tt][Ii][Cc][Kk][Ee][Tt][Ss]'  # Matches "tickets"
+    return t
+
+def t_MATCH(t):
+    r'[Mm][Aa][Tt][Cc][Hh]'  # Matches "match"
+    return t
+
+# Preposition tokens
+def t_FROM(t):
+    r'[Ff][Rr][Oo][Mm]'  # Matches "from"
+    return t
+
+def t_TO(t):
+    r'[Tt][Oo]'  # Matches "to"
+    return t
+
+def t_ON(t):
+    r'[Oo][Nn]'  # Matches "on"
+    return t
+
+def t_AT(t):
+    r'[Aa][Tt]'  # Matches "at"
+    return t
+
+def t_FOR(t):
+    r'[Ff][Oo][Rr]'  # Matches "for"
+    return t
+
+def t_IN(t):
+    r'[Ii][Nn]'  # Matches "in"
+    return t
+
+def t_MY(t):
+    r'[Mm][Yy]'  # Matches "my"
+    return t
+
+def t_AREA(t):
+    r'[Aa][Rr][Ee][Aa]'  # Matches "area"
+    return t
+
+def t_IDENTIFIER(t):
+    r'[A-Za-z]+'  # Matches any word not caught by other rules
+    t.value = t.value.lower()  # Convert to lowercase for consistency
+    return t
+
+def build_legacy_lexer():
+    """Builds a lexer from the per-keyword rules above"""
+    return lex.lex()
@@ -1,5 +1,81 @@
+import hashlib
+import importlib
+import os
+import sys
+import threading
+from collections import namedtuple
+from types import SimpleNamespace
 import ply.lex as lex
 import ply.yacc as yacc
+from functools import lru_cache
+from config import LEXER_MODE, PARSE_CACHE_SIZE, PARSER_OPTIMIZE
+
+# Prebuilt tables shipped next to this module (regenerate with build_tables.py)
+LEXER_TABLES = 'lextab'
+PARSER_TABLES = 'parsetab'
+
+class ParserTablesError(Exception):
+    """Raised when the prebuilt lexer/parser tables are missing or don't match the grammar"""
+    pass
+
+def _load_tables(module_name, attribute, signature):
+    """
+    Imports a prebuilt table module and checks it was built from this grammar
+
+    Raises:
+        ParserTablesError: If the module is missing or its signature differs
+    """
+    try:
+        tables = importlib.import_module(module_name)
+    except ImportError:
+        raise ParserTablesError(f"{module_name}.py is missing; run 'python build_tables.py'")
+    if getattr(tables, attribute, None) != signature:
+        raise ParserTablesError(f"{module_name}.py doesn't match the grammar in lexer_parser.py; "
+                                f"run 'python build_tables.py'")
+    return tables
+
+# One problem found while lexing or parsing a command
+#   message: readable description
+#   position: 0-based character offset into the parsed text
+#   token: offending text ('' at end of input)
+#   expected: token types the parser could have accepted there
+#             (empty for invalid characters)
+ParseError = namedtuple('ParseError', ['message', 'position', 'token', 'expected'])
+
+class ParseFailure:
+    """
+    Result of a command that didn't parse
+
+    Attributes:
+        command (str): The text that was parsed
+        errors (tuple): ParseError for every problem found, in input order
+
+    Notes:
+        - Deliberately not a tuple, so callers that check
+          isinstance(result, tuple) keep treating it as a failure
+    """
+    __slots__ = ('command', 'errors')
+
+    def __init__(self, command, errors):
+        self.command = command
+        self.errors = tuple(errors)
+
+    @property
+    def message(self):
+        """All error messages joined into one line"""
+        if not self.errors:
+            return "Could not understand that command"
+        return "; ".join(error.message for error in self.errors)
+
+    def __eq__(self, other):
+        return (isinstance(other, ParseFailure)
+                and (self.command, self.errors) == (other.command, other.errors))
+
+    def __hash__(self):
+        return hash((self.command, self.errors))
+
+    def __repr__(self):
+        return f"ParseFailure({self.command!r}, {list(self.errors)!r})"
 
 # --------------------------
 # Lexer (Tokenizer)
@@ -14,97 +90,23 @@ tokens = (
     # Prepositions and keywords
     'FROM', 'TO', 'ON', 'AT', 'FOR', 'IN', 'MY', 'AREA', 'MATCH',
     # Data types
-    'DATE', 'TIME', 'STRING', 'BOOKINGS', 'IDENTIFIER'
+    'DATE', 'TIME', 'STRING', 'BOOKINGS', 'IDENTIFIER', 'BOOKING_ID'
 )
 
-# Token matching rules (all case-insensitive)
-# Each function defines a regular expression pattern to match a token
-
-def t_LIST(t):
-    r'[Ll][Ii][Ss][Tt]'  # Matches "list" in any case combination
-    return t
-
-def t_BOOKINGS(t):
-    r'[Bb][Oo][Oo][Kk][Ii][Nn][Gg][Ss]'  # Matches "bookings"
-    return t
-
-def t_BOOK(t):
-    r'[Bb][Oo][Oo][Kk]'  # Matches "book"
-    return t
-
-def t_CONFIRM(t):
-    r'[Cc][Oo][Nn][Ff][Ii][Rr][Mm]'  # Matches "confirm"
-    return t
-
-def t_PAY(t):
-    r'[Pp][Aa][Yy]'  # Matches "pay"
-    return t
-
-def t_CANCEL(t):
-    r'[Cc][Aa][Nn][Cc][Ee][Ll]'  # Matches "cancel"
-    return t
-
-def t_VIEW(t):
-    r'[Vv][Ii][Ee][Ww]'  # Matches "view"
-    return t
-
-# Resource type tokens
-def t_CONCERT(t):
-    r'[Cc][Oo][Nn][Cc][Ee][Rr][Tt]'  # Matches "concert"
-    return t
-
-def t_FOOTBALL(t):
-    r'[Ff][Oo][Oo][Tt][Bb][Aa][Ll][Ll]'  # Matches "football"
-    return t
-
-def t_TRAIN(t):
-    r'[Tt][Rr][Aa][Ii][Nn]'  # Matches "train"
-    return t
-
-def t_AIRLINE(t):
-    r'[Aa][Ii][Rr][Ll][Ii][Nn][Ee]'  # Matches "airline"
-    return t
-
-def t_TICKETS(t):
-    r'[Tt][Ii][Cc][Kk][Ee][Tt][Ss]'  # Matches "tickets"
-    return t
-
-def t_MATCH(t):
-    r'[Mm][Aa][Tt][Cc][Hh]'  # Matches "match"
-    return t
-
-# Preposition tokens
-def t_FROM(t):
-    r'[Ff][Rr][Oo][Mm]'  # Matches "from"
-    return t
-
-def t_TO(t):
-    r'[Tt][Oo]'  # Matches "to"
-    return t
-
-def t_ON(t):
-    r'[Oo][Nn]'  # Matches "on"
-    return t
-
-def t_AT(t):
-    r'[Aa][Tt]'  # Matches "at"
-    return t
-
-def t_FOR(t):
-    r'[Ff][Oo][Rr]'  # Matches "for"
-    return t
-
-def t_IN(t):
-    r'[Ii][Nn]'  # Matches "in"
-    return t
-
-def t_MY(t):
-    r'[Mm][Yy]'  # Matches "my"
-    return t
-
-def t_AREA(t):
-    r'[Aa][Rr][Ee][Aa]'  # Matches "area"
-    return t
+# Keyword table: words are matched by one rule (t_IDENTIFIER) and looked up
+# here, so keywords are only recognised as whole words ("to" inside
+# "toronto" stays part of the identifier)
+reserved = {
+    # Command verbs
+    'list': 'LIST', 'book': 'BOOK', 'confirm': 'CONFIRM', 'pay': 'PAY',
+    'cancel': 'CANCEL', 'view': 'VIEW', 'bookings': 'BOOKINGS',
+    # Resource types
+    'concert': 'CONCERT', 'football': 'FOOTBALL', 'train': 'TRAIN',
+    'airline': 'AIRLINE', 'tickets': 'TICKETS', 'match': 'MATCH',
+    # Prepositions and keywords
+    'from': 'FROM', 'to': 'TO', 'on': 'ON', 'at': 'AT', 'for': 'FOR',
+    'in': 'IN', 'my': 'MY', 'area': 'AREA',
+}
 
 # Data type tokens
 def t_DATE(t):
@@ -115,27 +117,81 @@ def t_TIME(t):
     r'\d{2}:\d{2}'  # Matches HH:MM 24-hour format
     return t
 
+def t_BOOKING_ID(t):
+    r'\#\d+'  # Matches booking references like #42
+    t.value = int(t.value[1:])  # Numeric booking id
+    return t
+
 def t_STRING(t):
     r'\"[^\"]+\"'  # Matches quoted strings like "John Doe"
     t.value = t.value.strip('\"')  # Remove quotes from value
     return t
 
 def t_IDENTIFIER(t):
-    r'[A-Za-z]+'  # Matches any word not caught by other rules
+    r'[A-Za-z]+'  # Matches any word; keywords are resolved through reserved
     t.value = t.value.lower()  # Convert to lowercase for consistency
+    t.type = reserved.get(t.value, 'IDENTIFIER')
     return t
 
 # Ignore whitespace and tabs
 t_ignore = ' \t'
 
 def t_error(t):
-    """Error handling for invalid characters"""
-    error_msg = f"Invalid character '{t.value[0]}'"
+    """Records an invalid character and skips it, so lexing continues"""
+    errors = getattr(_thread_state, 'errors', None)
+    previous = errors[-1] if errors else None
+    if previous and not previous.expected and previous.position + len(previous.token) == t.lexpos:
+        # Report a run of invalid characters (e.g. "9:30") as one error
+        text = previous.token + t.value[0]
+        errors[-1] = ParseError(f"Invalid characters '{text}'", previous.position, text, ())
+    else:
+        _record_error(ParseError(f"Invalid character '{t.value[0]}'", t.lexpos, t.value[0], ()))
     t.lexer.skip(1)  # Skip the offending character
-    return error_msg
+
+def lexer_signature():
+    """
+    Fingerprint of the keyword lexer rules, stored in lextab.py
+
+    Notes:
+        - Covers the token list, keyword table, ignored characters and the
+          regex and order of every t_ rule, i.e. everything lextab encodes
+    """
+    rules = sorted((rule.__code__.co_firstlineno, name, rule.__doc__)
+                   for name, rule in globals().items()
+                   if name.startswith('t_') and callable(rule) and name != 't_error')
+    parts = [repr(tokens), repr(sorted(reserved.items())), repr(t_ignore)]
+    parts += [f"{name}={regex}" for _, name, regex in rules]
+    return hashlib.sha1("\n".join(parts).encode('utf-8')).hexdigest()
+
+def build_lexer(mode=LEXER_MODE, optimize=PARSER_OPTIMIZE):
+    """
+    Builds a lexer for the given mode
+
+    Args:
+        mode (str): 'keywords' (one word rule plus the reserved table) or
+                    'legacy' (one case-insensitive regex per keyword, see
+                    legacy_lexer.py)
+        optimize (bool): Load the prebuilt lextab.py instead of compiling
+                         and validating the rules (keyword mode only)
+
+    Returns:
+        ply.lex.Lexer: New lexer; both modes produce the same token types
+
+    Raises:
+        ParserTablesError: In optimized mode, if lextab.py is missing or stale
+    """
+    if mode == 'legacy':
+        from legacy_lexer import build_legacy_lexer
+        return build_legacy_lexer()
+    if mode != 'keywords':
+        raise ValueError(f"Unknown lexer mode '{mode}'")
+    if optimize:
+        _load_tables(LEXER_TABLES, '_lexsignature', lexer_signature())
+        return lex.lex(optimize=1, lextab=LEXER_TABLES)
+    return lex.lex()
 
 # Build the lexer
-lexer = lex.lex()
+lexer = build_lexer()
 
 # --------------------------
 # Parser Rules (Grammar Rules)
@@ -178,13 +234,25 @@ def p_book_event(p):
     })
 
 def p_status_command(p):
-    """status_command : CONFIRM event_type FOR person
-                      | PAY event_type FOR person
-                      | CANCEL event_type FOR person"""
-    p[0] = (p[1].upper(), { # Action in uppercase
+    """status_command : CONFIRM event_type booking_ref FOR person
+                      | PAY event_type booking_ref FOR person
+                      | CANCEL event_type booking_ref FOR person"""
+    data = {
         'type': p[2],  # Event type
-        'person': ' '.join(p[4])
-    })
+        'person': ' '.join(p[5])
+    }
+    if p[3] is not None:
+        data['booking_id'] = p[3]  # Optional "#id" booking reference
+    p[0] = (p[1].upper(), data) # Action in uppercase
+
+def p_booking_ref(p):
+    """booking_ref : BOOKING_ID
+                   | empty"""
+    p[0] = p[1]
+
+def p_empty(p):
+    """empty :"""
+    p[0] = None
 
 def p_view_command(p):
     """view_command : VIEW BOOKINGS"""
@@ -225,12 +293,241 @@ def p_event_name(p):
     else:
         p[0] = p[1] + [p[2]] # Multi-word event name
 
+# Readable names for token types in "expected ..." messages
+_TOKEN_DESCRIPTIONS = {
+    'IDENTIFIER': 'a name',
+    'STRING': 'a quoted name',
+    'DATE': 'a date (YYYY-MM-DD)',
+    'TIME': 'a time (HH:MM)',
+    'BOOKING_ID': 'a booking id (#42)',
+    '$end': 'end of command',
+}
+_TOKEN_DESCRIPTIONS.update((token, f"'{word}'") for word, token in reserved.items())
+
+def describe_expected(expected):
+    """Turns token types into readable text, e.g. 'for', a name or end of command"""
+    names = [_TOKEN_DESCRIPTIONS.get(token, token) for token in expected]
+    if len(names) <= 1:
+        return "".join(names)
+    return ", ".join(names[:-1]) + " or " + names[-1]
+
 def p_error(p):
+    """
+    Records a syntax error with the tokens the parser expected instead
+
+    Notes:
+        - PLY then recovers by discarding tokens until it can start over,
+          so later problems in the same text are reported too
+    """
+    current = getattr(_thread_state, 'parser', None)
+    state_actions = current.action.get(current.state, {}) if current is not None else {}
+    expected = tuple(sorted(token for token in state_actions if token != 'error'))
     if p:
         error_msg = f"Syntax error at '{p.value}'"
+        position, token = p.lexpos, str(p.value)
     else:
         error_msg = "Syntax error at end of input"
-    return error_msg
+        position, token = len(getattr(_thread_state, 'text', '')), ''
+    if expected:
+        error_msg += f"; expected {describe_expected(expected)}"
+    _record_error(ParseError(error_msg, position, token, expected))
+
+def parser_signature():
+    """Signature PLY computes for this grammar (stored in parsetab.py as _lr_signature)"""
+    grammar = yacc.ParserReflect(globals(), log=yacc.NullLogger())
+    grammar.get_all()
+    return grammar.signature()
+
+def build_parser(optimize=PARSER_OPTIMIZE):
+    """
+    Builds the LALR parser
+
+    Args:
+        optimize (bool): Load the prebuilt parsetab.py without validating the
+            grammar and never write table or parser.out files. Otherwise PLY
+            checks the rules and regenerates parsetab.py/parser.out whenever
+            the grammar changed (development mode).
+
+    Raises:
+        ParserTablesError: In optimized mode, if parsetab.py is missing or stale
+    """
+    if optimize:
+        _load_tables(PARSER_TABLES, '_lr_signature', parser_signature())
+        return yacc.yacc(tabmodule=PARSER_TABLES, optimize=1, write_tables=False, debug=False)
+    return yacc.yacc(tabmodule=PARSER_TABLES)
+
+def build_tables(outputdir=None):
+    """
+    Regenerates lextab.py and parsetab.py from the current grammar
+
+    Args:
+        outputdir (str): Target directory (default: next to this module)
+
+    Returns:
+        list: Paths of the written table files
+    """
+    outputdir = outputdir or os.path.dirname(os.path.abspath(__file__))
+    paths = [os.path.join(outputdir, f"{name}.py") for name in (LEXER_TABLES, PARSER_TABLES)]
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+    # Forget any copies imported before, so PLY can't pick up the old tables
+    for name in (LEXER_TABLES, PARSER_TABLES):
+        sys.modules.pop(name, None)
+    importlib.invalidate_caches()
+
+    lex.lex(optimize=1, lextab=LEXER_TABLES, outputdir=outputdir)
+    with open(paths[0], 'a') as f:
+        f.write(f"_lexsignature = {lexer_signature()!r}\n")
+    yacc.yacc(tabmodule=PARSER_TABLES, outputdir=outputdir, debug=False)
+    return paths
 
 #Build the parser
-parser = yacc.yacc()
\ No newline at end of file
+parser = build_parser()
+
+# --------------------------
+# Thread-Safe Parsing
+# --------------------------
+# PLY parsers and lexers keep their working state (stacks, input position)
+# on the object, so the module-level parser/lexer above must not be shared
+# by concurrent requests. Each thread gets its own LRParser over the shared,
+# read-only tables, and every parse runs on a fresh clone of the lexer.
+
+_thread_state = threading.local()
+
+def get_parser():
+    """
+    Returns the calling thread's parser
+
+    Notes:
+        - Built on first use from the module parser's tables; only the
+          parse stacks are per thread, so this costs microseconds
+    """
+    thread_parser = getattr(_thread_state, 'parser', None)
+    if thread_parser is None:
+        tables = SimpleNamespace(lr_productions=parser.productions,
+                                 lr_action=parser.action, lr_goto=parser.goto)
+        thread_parser = _thread_state.parser = yacc.LRParser(tables, parser.errorfunc)
+    return thread_parser
+
+def _record_error(error):
+    """Adds an error to the parse running on this thread (ignored outside parse())"""
+    errors = getattr(_thread_state, 'errors', None)
+    if errors is not None:
+        errors.append(error)
+
+def parse(text):
+    """
+    Parses one command; safe to call from any number of threads
+
+    Returns:
+        tuple/ParseFailure: Parser output, or a ParseFailure listing every
+                            lexing and syntax error found
+
+    Notes:
+        - Never raises for bad input. A command that PLY only parsed after
+          recovering from an error (e.g. "xyz view bookings") is still a
+          failure, so nothing runs on a partial parse.
+    """
+    _thread_state.errors = errors = []
+    _thread_state.text = text
+    try:
+        result = get_parser().parse(text, lexer=lexer.clone())
+    finally:
+        _thread_state.errors = None
+    if errors or result is None:
+        return ParseFailure(text, errors)
+    return result
+
+# --------------------------
+# Cached Parsing
+# --------------------------
+
+class FrozenDict(dict):
+    """
+    Read-only dict used in cached parse results
+
+    Notes:
+        - Cached results are shared by every caller, so mutation raises
+          TypeError instead of silently changing later parses
+        - Still a dict: json.dumps(), str() and isinstance checks behave
+          exactly as for the parser's original dicts
+    """
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Parse results are read-only; copy with dict() first")
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+def _freeze(value):
+    """Recursively converts parser output to immutable containers"""
+    if isinstance(value, dict):
+        return FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def normalize_command(text):
+    """Lowercases text and collapses runs of whitespace (the parse cache key)"""
+    return ' '.join(text.lower().split())
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_normalized(text):
+    return _freeze(parse(text))
+
+def parse_command(text):
+    """
+    Parses a command, reusing the result for previously seen text
+    
+    Args:
+        text (str): Raw command as typed by the user
+    
+    Returns:
+        tuple/ParseFailure: Parser output with dicts as FrozenDict, or a
+                            ParseFailure (positions refer to the
+                            normalized text)
+    
+    Notes:
+        - Commands that differ only in case or spacing share a cache entry
+        - LRU with config.PARSE_CACHE_SIZE entries
+        - Thread-safe: cache misses go through parse()
+    """
+    return _parse_normalized(normalize_command(text))
+
+def parse_many(commands):
+    """
+    Parses a batch of commands in one pass
+
+    Args:
+        commands (iterable): Command strings
+
+    Returns:
+        list: Parser output or ParseFailure per command, in input order
+
+    Notes:
+        - Bad commands don't stop the batch, so every problem in a bulk
+          import is reported at once
+    """
+    return [parse_command(command) for command in commands]
+
+def parse_cache_stats():
+    """Returns hit/miss counters and fill level of the parse cache"""
+    info = _parse_normalized.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'max_entries': info.maxsize,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+    }
+
+def clear_parse_cache():
+    """Empties the parse cache (e.g. after switching lexer mode in tests)"""
+    _parse_normalized.cache_clear()
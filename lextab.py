@@ -0,0 +1,11 @@
+# lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('AIRLINE', 'AREA', 'AT', 'BOOK', 'BOOKINGS', 'BOOKING_ID', 'CANCEL', 'CONCERT', 'CONFIRM', 'DATE', 'FOOTBALL', 'FOR', 'FROM', 'IDENTIFIER', 'IN', 'LIST', 'MATCH', 'MY', 'ON', 'PAY', 'STRING', 'TICKETS', 'TIME', 'TO', 'TRAIN', 'VIEW'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_DATE>\\d{4}-\\d{2}-\\d{2})|(?P<t_TIME>\\d{2}:\\d{2})|(?P<t_BOOKING_ID>\\#\\d+)|(?P<t_STRING>\\"[^\\"]+\\")|(?P<t_IDENTIFIER>[A-Za-z]+)', [None, ('t_DATE', 'DATE'), ('t_TIME', 'TIME'), ('t_BOOKING_ID', 'BOOKING_ID'), ('t_STRING', 'STRING'), ('t_IDENTIFIER', 'IDENTIFIER')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
+_lexsignature = '04d7388082e5bde196fc6c2c1ecdf649b1bc4493'
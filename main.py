@@ -1,14 +1,22 @@
 
-from flask import Flask, render_template, request, flash, redirect, url_for
-from command_processing import process_command
-from lexer_parser import parser
+from flask import Flask, Response, render_template, request, flash, redirect, url_for
+from markupsafe import Markup
+from command_processing import render_result, run_command
+from renderers import render_html
+from lexer_parser import parse_command
 from database import initialize_db
-from config import show_help
-from ast_generator import generate_ast
+from event_catalog import initialize_catalog
+from booking_views import bookings_bp, next_page_url
+from paging import DEFAULT_PAGE_SIZE
+from api import api_bp
+from config import show_help, AST_DEFAULT_FORMAT
+from ast_generator import request_ast_render, AST_MIMETYPES
 import os
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
+app.register_blueprint(bookings_bp)
+app.register_blueprint(api_bp)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -16,8 +24,10 @@ def index():
         command = request.form.get('command_input', '').strip()
         if command:
             try:
-                result = parser.parse(command.lower())
-                output = process_command(command, result, None)  # Pass None for output_box to get return value
+                result = run_command(command, parse_command(command))
+                # VIEW shows the first page and links to /bookings for the rest
+                output = Markup(render_result(render_html, result, max_rows=DEFAULT_PAGE_SIZE,
+                                              next_url=next_page_url))  # Escaped by render_html
                 return render_template('index.html', command=command, output=output, help_text=show_help())
             except Exception as e:
                 flash(str(e), 'error')
@@ -30,18 +40,28 @@ def index():
 @app.route('/show_ast')
 def show_ast_route():
     command = request.args.get('command_input', '').strip()
-    if command:
-        try:
-            result = parser.parse(command.lower())
-            ast_image = generate_ast(result)
-            return redirect(url_for('static', filename=ast_image))
-        except Exception as e:
-            flash(f'Error generating AST: {str(e)}', 'error')
+    fmt = request.args.get('format', AST_DEFAULT_FORMAT)  # png, svg or dot
+    engine = request.args.get('engine') or None           # builtin or graphviz
+    if fmt not in AST_MIMETYPES:
+        flash(f"Unsupported AST format '{fmt}'.", 'error')
+    elif command:
+        # Rendered in memory on the background pool; never blocks for long
+        render = request_ast_render(parse_command(command), fmt, engine)
+        if render.status == 'ready':
+            return Response(render.data, mimetype=AST_MIMETYPES[fmt])
+        if render.status == 'pending':
+            return Response('The AST is still rendering; try again in a moment.', status=202,
+                            mimetype='text/plain', headers={'Retry-After': '1'})
+        if render.status == 'busy':
+            return Response('The AST renderer is busy; try again shortly.', status=503,
+                            mimetype='text/plain', headers={'Retry-After': '2'})
+        flash(f'Error generating AST: {render.error}', 'error')
     return redirect(url_for('index'))
 
 if __name__ == '__main__':
     try:
         initialize_db()
+        initialize_catalog()
         app.run(host='0.0.0.0', port=5000)
     except Exception as e:
         print(f"Fatal error: {str(e)}")
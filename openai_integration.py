@@ -1,34 +1,226 @@
 import os
 import logging
 import openai
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from dotenv import load_dotenv
-from config import TICKET_LIMITS
+from config import (TICKET_LIMITS, AI_CACHE_SETTINGS, AI_CACHE_DB,
+                    AI_CONCURRENT_MODE, AI_CALL_DEADLINE, AI_MAX_WORKERS,
+                    AI_MODEL, AI_API_BASE, AI_REQUEST_TIMEOUT,
+                    AI_BREAKER_FAILURE_RATE, AI_BREAKER_WINDOW,
+                    AI_BREAKER_MIN_CALLS, AI_BREAKER_COOLDOWN)
+from response_cache import ResponseCache, SQLiteCacheStore, normalize_prompt
+from circuit_breaker import CircuitBreaker
 
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
-def get_chatgpt_response(prompt):
-    """Get response from ChatGPT"""
-    try:
-        if not openai.api_key:
-            return "Error: OpenAI API key not configured"
-            
+# Returned when a call fails or is refused and no better fallback exists
+AI_UNAVAILABLE_MESSAGE = "Sorry, I couldn't process that request right now."
+
+class AINotConfiguredError(Exception):
+    """Raised by a client that has no credentials; not counted as an outage"""
+
+class OpenAIChatClient:
+    """
+    Default chat client backed by the openai package
+
+    Args:
+        model (str): Chat model name
+        timeout (float): Per-request timeout in seconds
+        api_base (str, optional): Alternative endpoint, e.g. a local stub
+                                  server speaking the OpenAI chat API
+        api_key (str, optional): Overrides openai.api_key
+
+    Notes:
+        - Any object with a complete(prompt) -> str method can be installed
+          with set_ai_client(); it should raise on failure
+    """
+
+    def __init__(self, model=AI_MODEL, timeout=AI_REQUEST_TIMEOUT, api_base=AI_API_BASE, api_key=None):
+        self.model = model
+        self.timeout = timeout
+        self.api_base = api_base
+        self.api_key = api_key
+
+    def complete(self, prompt):
+        api_key = self.api_key or openai.api_key
+        if not api_key:
+            raise AINotConfiguredError("Error: OpenAI API key not configured")
+        kwargs = {'api_base': self.api_base} if self.api_base else {}
         response = openai.ChatCompletion.create(
-            model="gpt-4",
+            model=self.model,
             messages=[{"role": "user", "content": prompt}],
-            timeout=10
+            timeout=self.timeout,
+            request_timeout=self.timeout,
+            api_key=api_key,
+            **kwargs
         )
         return response['choices'][0]['message']['content']
+
+_ai_client = OpenAIChatClient()
+ai_circuit_breaker = CircuitBreaker(
+    failure_rate=AI_BREAKER_FAILURE_RATE,
+    window=AI_BREAKER_WINDOW,
+    min_calls=AI_BREAKER_MIN_CALLS,
+    cooldown=AI_BREAKER_COOLDOWN,
+)
+
+def set_ai_client(client):
+    """Installs the chat client used by get_chatgpt_response() and resets the breaker"""
+    global _ai_client
+    _ai_client = client
+    ai_circuit_breaker.reset()
+
+def get_ai_client():
+    return _ai_client
+
+# One cache per call type, optionally backed by a shared on-disk store
+_cache_store = SQLiteCacheStore(AI_CACHE_DB) if AI_CACHE_DB else None
+response_caches = {
+    name: ResponseCache(name, settings['ttl'], settings['max_entries'], _cache_store)
+    for name, settings in AI_CACHE_SETTINGS.items()
+}
+
+# Shared worker pool for OpenAI calls made off the request thread
+_ai_executor = ThreadPoolExecutor(max_workers=AI_MAX_WORKERS, thread_name_prefix="openai")
+
+# Shown in place of an AI response that missed its deadline
+AI_PENDING_PLACEHOLDER = "(AI response is taking longer than expected - please try again shortly)"
+
+def submit_ai_call(func, *args, **kwargs):
+    """
+    Starts an AI call on the worker pool without waiting for it
+
+    Returns:
+        concurrent.futures.Future: Resolve it with resolve_ai_call()
+    """
+    return _ai_executor.submit(func, *args, **kwargs)
+
+def resolve_ai_call(future, placeholder=AI_PENDING_PLACEHOLDER, deadline=None):
+    """
+    Waits for an AI call started with submit_ai_call(), up to a deadline
+
+    Args:
+        future (Future): Pending AI call
+        placeholder (str): Returned if the call misses the deadline or fails
+        deadline (float, optional): Seconds to wait; defaults to AI_CALL_DEADLINE
+
+    Notes:
+        - A call that misses the deadline keeps running in the background,
+          so its response still reaches the response cache for next time
+    """
+    try:
+        return future.result(timeout=AI_CALL_DEADLINE if deadline is None else deadline)
+    except FutureTimeout:
+        logging.warning("AI call missed its deadline, using placeholder")
+        return placeholder
+    except Exception as e:
+        logging.error(f"AI call failed: {str(e)}")
+        return placeholder
+
+def call_with_deadline(func, *args, placeholder=AI_PENDING_PLACEHOLDER, deadline=None, concurrent=None):
+    """
+    Runs an AI call with a deadline in concurrent mode, or directly
+    (blocking) otherwise
+
+    Args:
+        concurrent (Optional[bool]): Defaults to AI_CONCURRENT_MODE
+    """
+    if concurrent is None:
+        concurrent = AI_CONCURRENT_MODE
+    if not concurrent:
+        return func(*args)
+    return resolve_ai_call(submit_ai_call(func, *args), placeholder, deadline)
+
+def get_chatgpt_response(prompt, cache_type=None, cache_key=None, fallback=None):
+    """
+    Get response from ChatGPT, served from the response cache when possible
+
+    Args:
+        prompt (str): Prompt to send
+        cache_type (str, optional): Key into response_caches; None disables caching
+        cache_key (str, optional): Cache key; defaults to the normalized prompt
+        fallback (callable, optional): Produces a local answer when the call
+                                       fails or the circuit breaker is open
+
+    Notes:
+        - Only successful responses are cached, never error/apology strings
+        - While the breaker is open the API is not contacted at all, so
+          callers get an immediate answer instead of waiting for a timeout
+    """
+    cache = response_caches.get(cache_type)
+    if cache is not None:
+        cache_key = cache_key or normalize_prompt(prompt)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    def unavailable():
+        return fallback() if fallback else AI_UNAVAILABLE_MESSAGE
+
+    if not ai_circuit_breaker.allow_request():
+        return unavailable()
+
+    try:
+        content = _ai_client.complete(prompt)
+    except AINotConfiguredError as e:
+        ai_circuit_breaker.release()  # Not a call outcome; only frees any probe slot
+        return fallback() if fallback else str(e)
     except Exception as e:
         logging.error(f"OpenAI API error: {str(e)}")
-        return "Sorry, I couldn't process that request right now."
+        ai_circuit_breaker.record_failure()
+        return unavailable()
+    ai_circuit_breaker.record_success()
+
+    if cache is not None and content:
+        cache.set(cache_key, content)
+    return content
 
-def explain_user_command(raw_command):
+def _command_cache_key(raw_command, parsed_command):
+    """
+    Cache key for explanations: the parsed command shape when available,
+    so spacing/case variants of the same command share one entry
+    """
+    if isinstance(parsed_command, tuple):
+        command_type, *rest = parsed_command
+        parts = [command_type]
+        for item in rest:
+            if isinstance(item, dict):
+                parts.extend(f"{key}={normalize_prompt(value)}" for key, value in sorted(item.items()))
+            else:
+                parts.append(normalize_prompt(item))
+        return '|'.join(parts)
+    return normalize_prompt(raw_command)
+
+def explain_user_command(raw_command, parsed_command=None):
     """Generate natural language explanation of command"""
     prompt = f"""Explain this booking system command in simple terms:
     Command: "{raw_command}"
     Respond with just 1 sentence explaining what the user wants to do. nothing more"""
-    return get_chatgpt_response(prompt)
+    return get_chatgpt_response(prompt, 'explanation', _command_cache_key(raw_command, parsed_command),
+                                fallback=lambda: "Explanation unavailable right now.")
+
+# Served when no live or cached listing is available for an event type
+STATIC_EVENT_LISTINGS = {
+    'concert': "1. Reggae Sumfest - July at 20:00 in Montego Bay (Tickets on sale, JMD 8,000-25,000)\n"
+               "2. Jamaica Jazz & Blues - January at 19:00 in Trelawny (Tickets on sale, JMD 10,000-30,000)",
+    'football': "1. Jamaica Premier League Matchday - Weekends at 15:00 in Kingston (Tickets on sale, JMD 1,000-3,000)",
+    'train': "1. Kingston to Montego Bay - Daily at 08:00 (Seats available, JMD 3,000-6,000)",
+    'airline': "1. Kingston to Montego Bay - Daily at 07:30 (Seats available, USD 90-180)",
+}
+
+def local_event_listing(event_type):
+    """
+    Event listing used when the AI is unavailable: the last cached
+    response (even if expired), otherwise a static listing
+    """
+    cached = response_caches['events'].get(event_type, allow_expired=True)
+    if cached:
+        return cached
+    static = STATIC_EVENT_LISTINGS.get(event_type)
+    if static:
+        return f"Live listings are temporarily unavailable. Regular {event_type} options:\n{static}"
+    return f"Live {event_type} listings are temporarily unavailable."
 
 def get_real_time_info(event_type):
     """Get real-time event information"""
@@ -40,13 +232,25 @@ def get_real_time_info(event_type):
     - Price range
     Format as: "1. [Name] - [Date] at [Time] in [Location] ([Ticket info], [Price range])" """
     try:
-        return get_chatgpt_response(prompt) or "Could not retrieve event information"
+        return (get_chatgpt_response(prompt, 'events', event_type,
+                                     fallback=lambda: local_event_listing(event_type))
+                or "Could not retrieve event information")
     except Exception as e:
         logging.error(f"Error getting real-time info: {str(e)}")
         return f"Error retrieving {event_type} events"
 
+def local_limit_warning(person, event_type, current_count, requested_count):
+    """Templated ticket limit warning used when the AI response is unavailable"""
+    limit = TICKET_LIMITS.get(event_type, 0)
+    return (f"{person} already has {current_count} {event_type} ticket(s) and requested "
+            f"{requested_count} more, but the limit is {limit} per person. "
+            f"Please cancel an existing booking before making a new one.")
+
 def generate_ai_warning(person, event_type, current_count, requested_count):
     """Generate ticket limit warning"""
     prompt = f"""Customer {person} has {current_count} {event_type} tickets and wants {requested_count} more (limit {TICKET_LIMITS[event_type]}). 
     Create polite warning explaining the limit in 2 sentences max."""
-    return get_chatgpt_response(prompt)
\ No newline at end of file
+    cache_key = f"{normalize_prompt(person)}|{event_type}|{current_count}|{requested_count}"
+    return get_chatgpt_response(
+        prompt, 'warning', cache_key,
+        fallback=lambda: local_limit_warning(person, event_type, current_count, requested_count))
\ No newline at end of file
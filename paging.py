@@ -0,0 +1,38 @@
+# Query-string handling for the paged booking listings (/bookings and
+# /api/bookings): filters, page size and the keyset cursor for the next page.
+
+from flask import request, url_for
+from database import list_bookings_page
+
+MAX_PAGE_SIZE = 500
+DEFAULT_PAGE_SIZE = 50
+
+def booking_filters():
+    """Reads the resource/person/status filters from the query string"""
+    resource = request.args.get('resource', '').strip().lower()
+    person = request.args.get('person', '').strip().lower()
+    status = request.args.get('status', '').strip().capitalize()
+    return {'resource': resource or None, 'person': person or None, 'status': status or None}
+
+def read_page(endpoint):
+    """
+    Fetches the page of bookings the query string asks for
+
+    Args:
+        endpoint (str): Route that serves the listing, for the next-page link
+
+    Returns:
+        tuple: (rows, next page URL or None); the URL keeps the other query
+               parameters (filters, limit, format) and moves the cursor on
+
+    Notes:
+        - limit is clamped to 1..MAX_PAGE_SIZE
+    """
+    after_id = request.args.get('after', 0, type=int)
+    limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    rows, next_after = list_bookings_page(after_id, limit, **booking_filters())
+    next_url = None
+    if next_after is not None:
+        params = {key: value for key, value in request.args.items() if key != 'after'}
+        next_url = url_for(endpoint, after=next_after, **params)
+    return rows, next_url
@@ -0,0 +1,138 @@
+# Presentation of CommandResult objects (see command_processing.run_command)
+#
+# Each front end picks its renderer: the Flask pages use HTML, the API uses
+# JSON, the desktop GUI writes into a Tk widget and process_command() returns
+# text. tkinter is only imported by render_tk(), so the web server never
+# loads it.
+from html import escape
+from itertools import islice
+from database import booking_as_dict
+
+def format_booking(booking):
+    """Formats one booking row (BOOKING_COLUMNS layout) as a display line"""
+    return (
+        f"ID: {booking[0]}, "
+        f"Resource: {booking[1]}, "
+        f"Details: {booking[3]}, "
+        f"Status: {booking[4]}\n"
+    )
+
+def booking_row_html(booking):
+    """Formats one booking row as an HTML table row (id, resource, person, details, status, updated)"""
+    cells = (booking[0], booking[1], booking[6], booking[3], booking[4], booking[5])
+    return "<tr>" + "".join(f"<td>{escape(str(cell or ''))}</td>" for cell in cells) + "</tr>"
+
+BOOKING_TABLE_HEADER = ("<table border='1'><tr><th>ID</th><th>Resource</th><th>Person</th>"
+                        "<th>Details</th><th>Status</th><th>Updated</th></tr>")
+
+def _explanation_text(result):
+    return f"\nExplanation: {result.explanation}\n" if result.explanation else ""
+
+def render_text(result):
+    """
+    Renders a CommandResult as the plain text shown to users
+
+    Returns:
+        str: Explanation, message and one line per booking row
+    """
+    return "".join(render_text_chunks(result))
+
+def render_text_chunks(result, batch_size=500):
+    """
+    Yields the plain text of a CommandResult in pieces
+
+    Notes:
+        - The header comes first, then booking rows batch_size lines at a
+          time, so large listings can be shown as they stream in
+    """
+    output = _explanation_text(result)
+    if result.rows is None:
+        yield output + result.message + "\n"
+        return
+    yield output + f"\n{result.message}\n"
+    lines = []
+    for row in result.rows:
+        lines.append(format_booking(row))
+        if len(lines) >= batch_size:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+def render_html(result, max_rows=None, next_url=None):
+    """
+    Renders a CommandResult as an HTML fragment
+
+    Args:
+        result (CommandResult): Command outcome
+        max_rows (Optional[int]): Cap on booking rows included
+        next_url (Optional[callable]): Maps the last shown booking id to
+            the URL of the following page; linked when rows were cut off
+
+    Notes:
+        - All values are escaped; the fragment can be inserted into a page as is
+        - The status is exposed as a CSS class (result-ok, result-warning, result-error)
+        - Only max_rows + 1 rows are read, so a capped VIEW never loads the
+          whole table
+    """
+    parts = [f"<div class='result result-{result.status}'>"]
+    if result.explanation:
+        parts.append(f"<p class='explanation'>{escape(result.explanation)}</p>")
+    message = escape(result.message).replace("\n", "<br>")
+    parts.append(f"<p class='message'>{message}</p>")
+    if result.rows is not None:
+        rows = result.rows if max_rows is None else list(islice(result.rows, max_rows + 1))
+        more = max_rows is not None and len(rows) > max_rows
+        if more:
+            rows = rows[:max_rows]
+        parts.append(BOOKING_TABLE_HEADER)
+        parts.extend(booking_row_html(row) for row in rows)
+        parts.append("</table>")
+        if more and next_url is not None:
+            parts.append(f"<p><a href='{escape(next_url(rows[-1][0]))}'>More bookings</a></p>")
+    parts.append("</div>")
+    return "".join(parts)
+
+def render_json(result, max_rows=None):
+    """
+    Renders a CommandResult as a JSON-serializable dict
+
+    Args:
+        result (CommandResult): Command outcome
+        max_rows (Optional[int]): Cap on booking rows included
+
+    Returns:
+        dict: {"status", "message"} plus "explanation", "data" and
+              "bookings" when present. When rows were cut off at max_rows,
+              "next_after" holds the id to continue listing from.
+
+    Notes:
+        - Empty fields are left out to keep responses compact
+    """
+    payload = {'status': result.status, 'message': result.message}
+    if result.explanation:
+        payload['explanation'] = result.explanation
+    if result.data is not None:
+        payload['data'] = result.data
+    if result.rows is not None:
+        if max_rows is None:
+            rows = list(result.rows)
+        else:
+            rows = list(islice(result.rows, max_rows + 1))
+            if len(rows) > max_rows:
+                rows = rows[:max_rows]
+                payload['next_after'] = rows[-1][0]
+        payload['bookings'] = [booking_as_dict(row) for row in rows]
+    return payload
+
+def render_tk(output_box, result, batch_size=500):
+    """
+    Writes a CommandResult into a Tk text widget
+
+    Notes:
+        - Booking rows are inserted batch_size lines at a time, so large
+          listings cost a few widget updates instead of one per row
+    """
+    import tkinter as tk  # Only the desktop GUI needs Tk
+    for chunk in render_text_chunks(result, batch_size):
+        output_box.insert(tk.END, chunk)
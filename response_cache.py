@@ -0,0 +1,142 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+def normalize_prompt(text):
+    """Lowercases and collapses whitespace so trivially different prompts share a key"""
+    return ' '.join(str(text).lower().split())
+
+class SQLiteCacheStore:
+    """
+    On-disk backing store so cached AI responses survive restarts
+
+    Notes:
+        - One table shared by every ResponseCache, partitioned by cache name
+        - Uses its own connection (separate from the bookings pool) guarded
+          by a lock, since cache traffic is small and latency-tolerant
+        - Expired rows are ignored on read and purged on startup
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS ai_cache (
+                cache_name TEXT NOT NULL,
+                cache_key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (cache_name, cache_key)
+            )''')
+        self._conn.execute('DELETE FROM ai_cache WHERE expires_at < ?', (time.time(),))
+
+    def get(self, cache_name, key):
+        """Returns (value, expires_at) or None if missing/expired"""
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT value, expires_at FROM ai_cache
+                WHERE cache_name = ? AND cache_key = ? AND expires_at >= ?''',
+                (cache_name, key, time.time())).fetchone()
+        return row
+
+    def set(self, cache_name, key, value, expires_at):
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO ai_cache (cache_name, cache_key, value, expires_at)
+                VALUES (?, ?, ?, ?)''', (cache_name, key, value, expires_at))
+
+    def clear(self, cache_name=None):
+        with self._lock:
+            if cache_name is None:
+                self._conn.execute('DELETE FROM ai_cache')
+            else:
+                self._conn.execute('DELETE FROM ai_cache WHERE cache_name = ?', (cache_name,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class ResponseCache:
+    """
+    TTL + LRU cache for one type of AI call
+
+    Args:
+        name (str): Cache name (call type), used to partition the store
+        ttl (float): Seconds an entry stays valid
+        max_entries (int): In-memory entries kept before evicting the
+                           least recently used one
+        store (SQLiteCacheStore, optional): Persistent backing store
+
+    Notes:
+        - Thread-safe; Flask workers share one instance per call type
+        - Memory misses fall through to the store and repopulate memory
+    """
+
+    def __init__(self, name, ttl, max_entries, store=None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key, allow_expired=False):
+        """
+        Returns the cached value for key, or None on a miss
+
+        Args:
+            allow_expired (bool): Also return an entry past its TTL (used
+                                  for last-known-good fallbacks)
+
+        Notes:
+            - Expired entries stay in memory until LRU eviction so they
+              can still serve as fallbacks
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (allow_expired or entry[1] >= now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        stored = self.store.get(self.name, key) if self.store else None
+        with self._lock:
+            if stored is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, stored[0], stored[1])
+            return stored[0]
+
+    def set(self, key, value):
+        """Caches value under key for ttl seconds"""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self.store:
+            self.store.set(self.name, key, value, expires_at)
+
+    def _remember(self, key, value, expires_at):
+        """Inserts into the LRU; caller holds the lock"""
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+        if self.store:
+            self.store.clear(self.name)
+
+    def stats(self):
+        """Returns hit/miss counters and current size"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
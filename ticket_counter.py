@@ -0,0 +1,100 @@
+import threading
+import time
+
+class TicketCounterIndex:
+    """
+    In-process index of active (non-cancelled) ticket counts
+
+    Keyed by (person, resource) so ticket limit checks are a dict lookup
+    instead of a COUNT query. The database module keeps it current as
+    bookings are added and change status.
+
+    Notes:
+        - Built from the bookings table at startup (rebuild())
+        - Writers apply deltas only (adjust(), apply_status_change()), so
+          updates from concurrent transactions commute; an absolute count
+          read inside one transaction could overwrite a newer change
+        - Advisory: limits are enforced by the database count taken under
+          the write lock (database.reserve_booking)
+        - Only reflects writes made by this process; in multi-process
+          deployments use verify() or a refresh interval (max_age) to
+          pick up other workers' bookings
+        - All methods are thread-safe
+    """
+
+    def __init__(self, max_age=0):
+        """
+        Args:
+            max_age (float): Seconds before the index is considered stale
+                             and should be rebuilt; 0 disables expiry
+        """
+        self.max_age = max_age
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._built_at = None
+
+    @staticmethod
+    def _load(conn):
+        """Reads the authoritative counts from the bookings table"""
+        rows = conn.execute('''
+            SELECT person, resource, COUNT(*) FROM bookings
+            WHERE status != 'Cancelled' AND person IS NOT NULL
+            GROUP BY resource, person''').fetchall()
+        return {(person, resource): count for person, resource, count in rows}
+
+    def rebuild(self, conn):
+        """Replaces the whole index with fresh counts from the database"""
+        counts = self._load(conn)
+        with self._lock:
+            self._counts = counts
+            self._built_at = time.monotonic()
+
+    def verify(self, conn):
+        """
+        Compares the index against the database
+
+        Returns:
+            dict: {(person, resource): (cached_count, actual_count)} for
+                  every key that disagrees; empty when consistent
+        """
+        actual = self._load(conn)
+        with self._lock:
+            keys = set(actual) | set(self._counts)
+            return {
+                key: (self._counts.get(key, 0), actual.get(key, 0))
+                for key in keys
+                if self._counts.get(key, 0) != actual.get(key, 0)
+            }
+
+    def needs_rebuild(self):
+        """True if the index was never built or is older than max_age"""
+        with self._lock:
+            if self._built_at is None:
+                return True
+            return bool(self.max_age) and time.monotonic() - self._built_at > self.max_age
+
+    def get(self, person, resource):
+        """Returns the active ticket count for a person and resource"""
+        with self._lock:
+            return self._counts.get((person, resource), 0)
+
+    def adjust(self, person, resource, delta):
+        """Adds delta to a count, never going below zero"""
+        with self._lock:
+            key = (person, resource)
+            self._counts[key] = max(0, self._counts.get(key, 0) + delta)
+
+    def apply_status_change(self, person, resource, old_status, new_status):
+        """
+        Updates the count for a booking status transition
+
+        Notes:
+            - Moving into 'Cancelled' frees a ticket, moving out of it
+              takes one again; all other transitions leave counts unchanged
+        """
+        was_active = old_status != 'Cancelled'
+        is_active = new_status != 'Cancelled'
+        if was_active and not is_active:
+            self.adjust(person, resource, -1)
+        elif is_active and not was_active:
+            self.adjust(person, resource, 1)
@@ -1,6 +1,6 @@
 import datetime
-from database import connect_db
-from openai_integration import generate_ai_warning
+from database import get_active_ticket_count
+from openai_integration import generate_ai_warning, local_limit_warning, call_with_deadline
 from config import TICKET_LIMITS
 
 def validate_datetime(date_str, time_str=None):
@@ -41,31 +41,31 @@ def validate_datetime(date_str, time_str=None):
     except ValueError as e:
         return f"Invalid format: {str(e)}. Use YYYY-MM-DD and HH:MM"
 
-def check_ticket_limit(person, event_type, quantity=1):
+def check_ticket_limit(person, event_type, quantity=1, concurrent=None):
     """
-    Enforces per-person ticket limits using database checks and AI warnings
+    Predicts per-person ticket limits from the in-memory counter, with AI warnings
     
     Notes:
         - Limits are configured in config.TICKET_LIMITS
-        - AI warning generates context-specific messages
+        - Counts come from database.ticket_counts (O(1), no I/O); they can
+          lag other processes, so a refusal here is only a prediction and
+          database.reserve_booking() makes the decision
+        - AI warning generates context-specific messages, falling back to
+          a templated warning if it misses AI_CALL_DEADLINE
+        - concurrent selects deadline or blocking mode for the AI call
+          (see openai_integration.call_with_deadline)
     """
-    conn = connect_db()
-    cursor = conn.cursor()
-    
     # Count existing active bookings for this person and event type
-    cursor.execute('''
-        SELECT COUNT(*) FROM bookings 
-        WHERE resource = ? AND details LIKE ? AND status != 'Cancelled'
-    ''', (event_type, f'%{person}%'))
-    
-    current_count = cursor.fetchone()[0]
-    conn.close()
+    current_count = get_active_ticket_count(person, event_type)
     
     # Check against configured limits
     limit = TICKET_LIMITS.get(event_type, 0)
     if current_count + quantity > limit:
         # Generate AI-powered warning message
-        warning = generate_ai_warning(person, event_type, current_count, quantity)
+        warning = call_with_deadline(
+            generate_ai_warning, person, event_type, current_count, quantity,
+            placeholder=local_limit_warning(person, event_type, current_count, quantity),
+            concurrent=concurrent)
         return False, warning
         
     return True, None
\ No newline at end of file